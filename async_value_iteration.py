@@ -1,18 +1,41 @@
+import heapq
+import time
+import warnings
 import numpy as np
+from grid_world import GridWorld
+from numba_kernels import NUMBA_AVAILABLE, async_sweep, compiled
+from stopping_criteria import StoppingCriteria
+def combine_extremes(extremes):
+    # Smallest and largest change over several (lowest, highest) pairs
+    return min((lowest for lowest, _ in extremes), default=np.inf), max((highest for _, highest in extremes), default=-np.inf)
 class AsynchronousValueIteration:
-    def __init__(self, immediate_reward=-0.04, discount_factor=0.9, goal_pos=(0, 2), pit_pos=(1, 2), wall_pos=(1, 1)):
+    ORDERINGS = ("row_major", "red_black", "goal_outward")
+    def __init__(self, immediate_reward=-0.04, discount_factor=0.9, goal_pos=(0, 2), pit_pos=(1, 2), wall_pos=(1, 1), shape=(3, 3), verbose=0, ordering="row_major", backend="numpy"):
+        if ordering not in self.ORDERINGS:
+            raise ValueError(f"Unknown ordering {ordering!r}, expected one of {self.ORDERINGS}")
+        if backend not in ("numpy", "numba"):
+            raise ValueError(f"Unknown backend {backend!r}, expected 'numpy' or 'numba'")
+        if backend == "numba" and not NUMBA_AVAILABLE:
+            warnings.warn("numba is not installed, falling back to the NumPy backend", stacklevel=2)
+            backend = "numpy"
         self.immediate_reward = immediate_reward
         self.discount_factor = discount_factor
-        # Initialize value table
-        self.value_table = np.zeros((3, 3))
-        # Set terminal and wall states
-        self.goal_pos = goal_pos
-        self.pit_pos = pit_pos
-        self.wall_pos = wall_pos
-        # Initial values for terminal states
-        self.value_table[goal_pos] = 1.0
-        self.value_table[pit_pos] = -1.0
-        # The wall is technically not reachable, so it stays 0
+        # row_major is the reference Python loop; red_black and goal_outward
+        # are vectorized in-place orderings over the same dynamics
+        self.ordering = ordering
+        # backend="numba" runs the row-major loop as a compiled kernel
+        self.backend = backend
+        # 0: silent, 1: start line and run summary, 2: also the table after every sweep
+        self.verbose = verbose
+        # Terminal and wall states as boolean masks; each position argument
+        # takes one (row, col), a collection of them or a boolean mask
+        self.grid = GridWorld(shape, goal_pos, pit_pos, wall_pos)
+        # Initial values for terminal states, the wall stays 0
+        self.value_table = self.grid.initial_value_table()
+        self.backups = 0
+        # Flat successor/predecessor arrays and BFS layers, built on first use
+        self.successors = None
+        self.layers = None
     def print_value_table(self):
         # Rounding for readability
         print(np.round(self.value_table, 4))
@@ -22,22 +45,25 @@ class AsynchronousValueIteration:
         """
         Updates the value table in-place. Changes made to one cell
         are immediately visible to the next cell in the same loop.
+        Returns the smallest and largest signed change.
         """
         actions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # up, down, left, right
-        max_delta = 0
-        for i in range(3):
-            for j in range(3):
+        lowest, highest = np.inf, -np.inf
+        rows, cols = self.grid.shape
+        fixed, wall = self.grid.fixed, self.grid.wall
+        for i in range(rows):
+            for j in range(cols):
                 # Skip terminal states (Goal/Pit) and Walls
-                if (i, j) == self.goal_pos or (i, j) == self.pit_pos or (i, j) == self.wall_pos:
+                if fixed[i, j]:
                     continue
                 old_v = self.value_table[i, j]
                 max_value = float('-inf')
                 for action in actions:
                     next_i, next_j = i + action[0], j + action[1]
                     # Boundary check and Wall check
-                    if (next_i < 0 or next_i >= 3 or 
-                        next_j < 0 or next_j >= 3 or 
-                        (next_i, next_j) == self.wall_pos):
+                    if (next_i < 0 or next_i >= rows or
+                        next_j < 0 or next_j >= cols or
+                        wall[next_i, next_j]):
                         next_state = (i, j)
                     else:
                         next_state = (next_i, next_j)
@@ -48,22 +74,262 @@ class AsynchronousValueIteration:
                         max_value = expected_value
                 # Update table immediately
                 self.value_table[i, j] = max_value
+                self.backups += 1
                 # Track the change for convergence check
-                max_delta = max(max_delta, abs(old_v - self.value_table[i, j]))
-        return max_delta
-    def run_value_iteration(self, max_iterations=100, delta_threshold=0.0001):
-        print("Starting Asynchronous Value Iteration...")
-        print("Initial Table:")
-        self.print_value_table()
-        print("-" * 30)
-        for iteration in range(1, max_iterations + 1):
-            delta = self.update_value_table_asynchronous()
-            print(f"Iteration {iteration} (Max Delta: {delta:.6f}):")
+                change = max_value - old_v
+                lowest, highest = min(lowest, change), max(highest, change)
+        return lowest, highest
+    def build_model(self):
+        """
+        Flat successor indices of shape (cells, 4) and predecessor lists in
+        CSR form (predecessor_start/predecessor_index), using the same
+        boundary and wall rule as the full sweep. Used by the vectorized
+        orderings and by prioritized sweeping.
+        """
+        actions = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)])  # up, down, left, right
+        rows, cols = self.grid.shape
+        i, j = np.divmod(np.arange(rows * cols), cols)
+        next_i = i[:, None] + actions[:, 0]
+        next_j = j[:, None] + actions[:, 1]
+        blocked = (next_i < 0) | (next_i >= rows) | (next_j < 0) | (next_j >= cols)
+        blocked[~blocked] = self.grid.wall[next_i[~blocked], next_j[~blocked]]
+        self.successors = np.where(blocked, (i * cols + j)[:, None], next_i * cols + next_j)
+        self.states = np.flatnonzero(~self.grid.fixed.ravel())
+        # Group the (state, successor) edges of updatable states by successor
+        sources = np.repeat(self.states, len(actions))
+        targets = self.successors[self.states].ravel()
+        order = np.argsort(targets, kind="stable")
+        self.predecessor_index = sources[order]
+        self.predecessor_start = np.searchsorted(targets[order], np.arange(rows * cols + 1))
+    def predecessors_of(self, states):
+        # Concatenated predecessor lists of many states, straight from the CSR arrays
+        starts, ends = self.predecessor_start[states], self.predecessor_start[states + 1]
+        lengths = ends - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.predecessor_index[offsets + np.arange(lengths.sum())]
+    def backup_states(self, states):
+        """
+        Backs up a set of flat state indices at once, in place, and returns
+        the smallest and largest signed change. States in the same call see each other's old
+        values, so this matches a sequential update when none of them is
+        another's successor.
+        """
+        values = self.value_table.ravel()
+        new_values = np.max(self.bellman_equation(self.immediate_reward, values[self.successors[states]]), axis=1)
+        changes = new_values - values[states]
+        values[states] = new_values
+        self.backups += len(states)
+        return changes.min(initial=np.inf), changes.max(initial=-np.inf)
+    def update_value_table_numba(self):
+        """
+        The row-major in-place sweep of update_value_table_asynchronous as a
+        numba-compiled kernel over the flat successor arrays.
+        """
+        if self.successors is None:
+            self.build_model()
+        extremes = compiled(async_sweep)(self.value_table.ravel(), self.successors, self.states,
+                                         self.immediate_reward, self.discount_factor)
+        self.backups += len(self.states)
+        return extremes
+    def update_value_table_red_black(self):
+        """
+        Gauss-Seidel sweep in checkerboard order: every neighbour of a red
+        cell is black and vice versa, so each colour is one vectorized
+        in-place update that already sees the other colour's new values.
+        """
+        if self.successors is None:
+            self.build_model()
+        rows, cols = self.grid.shape
+        i, j = np.divmod(self.states, cols)
+        red = (i + j) % 2 == 0
+        return combine_extremes([self.backup_states(self.states[red]), self.backup_states(self.states[~red])])
+    def update_value_table_goal_outward(self):
+        """
+        In-place sweep that visits states in order of BFS distance from the
+        terminals, so new values propagate outward within a single sweep.
+        States at the same distance are backed up together as one vectorized
+        update; states that cannot reach a terminal come last.
+        """
+        if self.successors is None:
+            self.build_model()
+        if self.layers is None:
+            self.layers = self.goal_outward_layers()
+        return combine_extremes([self.backup_states(layer) for layer in self.layers])
+    def goal_outward_layers(self):
+        rows, cols = self.grid.shape
+        distance = np.full(rows * cols, -1)
+        frontier = np.flatnonzero((self.grid.goal | self.grid.pit).ravel())
+        distance[frontier] = 0
+        updatable = np.zeros(rows * cols, dtype=bool)
+        updatable[self.states] = True
+        layers = []
+        while len(frontier):
+            predecessors = np.unique(self.predecessors_of(frontier))
+            frontier = predecessors[(distance[predecessors] < 0) & updatable[predecessors]]
+            distance[frontier] = len(layers) + 1
+            if len(frontier):
+                layers.append(frontier)
+        unreached = self.states[distance[self.states] < 0]
+        if len(unreached):
+            layers.append(unreached)
+        return layers
+    def action_values(self):
+        """
+        Backed-up value of each action in every cell, shape (4, rows, cols),
+        using the same boundary and wall rule as the in-place sweep.
+        """
+        actions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # up, down, left, right
+        rows, cols = self.grid.shape
+        i, j = np.indices(self.grid.shape)
+        action_values = np.empty((len(actions), rows, cols))
+        for a, action in enumerate(actions):
+            next_i, next_j = i + action[0], j + action[1]
+            blocked = (next_i < 0) | (next_i >= rows) | (next_j < 0) | (next_j >= cols)
+            blocked[~blocked] = self.grid.wall[next_i[~blocked], next_j[~blocked]]
+            next_i, next_j = np.where(blocked, i, next_i), np.where(blocked, j, next_j)
+            action_values[a] = self.bellman_equation(self.immediate_reward, self.value_table[next_i, next_j])
+        return action_values
+    def greedy_policy(self):
+        """
+        Index into [up, down, left, right] of the best action in every cell,
+        -1 for terminal states and walls.
+        """
+        return np.where(self.grid.fixed, -1, np.argmax(self.action_values(), axis=0))
+    def table_view(self):
+        # Read-only view handed to on_sweep callbacks
+        table_view = self.value_table.view()
+        table_view.flags.writeable = False
+        return table_view
+    def print_start(self, name):
+        if self.verbose >= 1:
+            print(f"Starting {name}...")
+        if self.verbose >= 2:
+            print("Initial Table:")
             self.print_value_table()
-            if delta < delta_threshold:
-                print(f"\nConverged in {iteration} iterations.")
+            print("-" * 30)
+    def print_summary(self):
+        if self.verbose >= 1:
+            print(self.stopping.summary())
+    def run_value_iteration(self, max_iterations=100, delta_threshold=0.0001, stopping=(), policy_patience=5, time_budget=None, on_sweep=None):
+        """
+        on_sweep, if given, is called as on_sweep(iteration, delta, table_view)
+        after every sweep with a read-only view of the value table.
+        """
+        self.print_start("Asynchronous Value Iteration")
+        step = {
+            "row_major": self.update_value_table_numba if self.backend == "numba" else self.update_value_table_asynchronous,
+            "red_black": self.update_value_table_red_black,
+            "goal_outward": self.update_value_table_goal_outward,
+        }[self.ordering]
+        self.stopping = StoppingCriteria(delta_threshold, self.discount_factor, stopping, policy_patience, time_budget)
+        self.backups = 0
+        for iteration in range(1, max_iterations + 1):
+            # Steps report the extremes of their change, so the table is never copied
+            lowest, highest = step()
+            policy = self.greedy_policy() if self.stopping.needs_policy else None
+            done = self.stopping.check_extremes(lowest, highest, policy)
+            if self.verbose >= 2:
+                print(f"Iteration {iteration} (Max Delta: {self.stopping.delta:.6f}):")
+                self.print_value_table()
+            if on_sweep is not None:
+                on_sweep(iteration, self.stopping.delta, self.table_view())
+            if done:
+                if self.verbose >= 1:
+                    print(f"\nConverged in {iteration} iterations.")
                 break
+        self.stopping.finish(self.backups)
+        self.print_summary()
+        return self.stopping
+class PrioritizedSweepingValueIteration(AsynchronousValueIteration):
+    """
+    Asynchronous value iteration that always backs up the state with the
+    largest Bellman error next. After a backup only the predecessors of the
+    changed state are re-scored and re-queued, so changes near the goal
+    reach the start without sweeping the whole grid.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The queue decides the backup order and the backups run in Python
+        if self.ordering != "row_major" or self.backend != "numpy":
+            raise ValueError("Prioritized sweeping chooses its own backup order; ordering and backend cannot be set")
+    def backup_value(self, state):
+        values = self.value_table.ravel()
+        return max(self.bellman_equation(self.immediate_reward, values[next_state])
+                   for next_state in self.successors[state])
+    def predecessors(self, state):
+        # The same predecessor can appear once per action leading to state
+        return set(self.predecessor_index[self.predecessor_start[state]:self.predecessor_start[state + 1]].tolist())
+    def run_value_iteration(self, max_iterations=100, delta_threshold=0.0001, stopping=(), policy_patience=5, time_budget=None, on_sweep=None):
+        """
+        Runs until every state's Bellman error is below delta_threshold, or
+        until max_iterations full-sweep equivalents of backups have been
+        spent. There are no sweeps, so on_sweep is called once per full-sweep
+        equivalent of backups, with the largest Bellman error still queued.
+        Of the extra stopping rules only "time" applies, checked at the same
+        points; "span" and "policy" need whole sweeps and are rejected.
+        """
+        if "span" in stopping or "policy" in stopping:
+            raise ValueError("Prioritized sweeping supports only the 'time' stopping rule")
+        self.print_start("Prioritized Sweeping Value Iteration")
+        self.stopping = StoppingCriteria(delta_threshold, self.discount_factor, stopping, policy_patience, time_budget)
+        self.build_model()
+        sweep_size = max(len(self.states), 1)
+        max_backups = max_iterations * sweep_size
+        # heapq is a min-heap, so priorities are stored negated; entries whose
+        # priority no longer matches self.priority are stale and skipped
+        self.priority = {}
+        queue = []
+        values = self.value_table.ravel()
+        for state in self.states.tolist():
+            error = abs(self.backup_value(state) - values[state])
+            if error >= delta_threshold:
+                self.priority[state] = error
+                queue.append((-error, state))
+        heapq.heapify(queue)
+        self.backups = 0
+        while queue and self.backups < max_backups:
+            error, state = heapq.heappop(queue)
+            if self.priority.get(state) != -error:
+                continue
+            del self.priority[state]
+            values[state] = self.backup_value(state)
+            self.backups += 1
+            for predecessor in self.predecessors(state):
+                error = abs(self.backup_value(predecessor) - values[predecessor])
+                if error >= delta_threshold and error != self.priority.get(predecessor):
+                    self.priority[predecessor] = error
+                    heapq.heappush(queue, (-error, predecessor))
+            if self.backups % sweep_size == 0:
+                self.stopping.sweeps += 1
+                self.stopping.delta = max(self.priority.values(), default=0.0)
+                if on_sweep is not None:
+                    on_sweep(self.stopping.sweeps, self.stopping.delta, self.table_view())
+                if "time" in stopping and time.perf_counter() - self.stopping.start_time >= time_budget:
+                    self.stopping.fired = "time"
+                    self.stopping.sweeps_saved = self.stopping.remaining_sweeps(self.stopping.delta)
+                    break
+        # Count the final partial sweep equivalent and report the largest
+        # remaining Bellman error as the final delta
+        if self.backups % sweep_size:
+            self.stopping.sweeps += 1
+        self.stopping.delta = max(self.priority.values(), default=0.0)
+        if not self.priority:
+            self.stopping.fired = "max_norm"
+            self.stopping.sweeps_saved = 0
+        self.stopping.finish(self.backups)
+        if self.verbose >= 2:
+            self.print_value_table()
+        if self.verbose >= 1:
+            if self.stopping.fired == "time":
+                print(f"\nStopped at the time budget after {self.backups} backups.")
+            elif self.priority:
+                print(f"\nStopped at the backup budget of {max_backups}.")
+            else:
+                print(f"\nConverged after {self.backups} backups "
+                      f"({self.backups / sweep_size:.1f} full-sweep equivalents).")
+        self.print_summary()
+        return self.stopping
 if __name__ == "__main__":
     # You will notice this converges faster than the synchronous version
-    vi = AsynchronousValueIteration()
+    vi = AsynchronousValueIteration(verbose=2)
     vi.run_value_iteration()
\ No newline at end of file
@@ -0,0 +1,83 @@
+import numpy as np
+from value_iteration_pygame import build_transition_model, greedy_actions
+class BatchFrozenLake:
+    """
+    Solves many FrozenLake maps at once. Every map is compiled into the same
+    (B, S, A, 3) successor/probability tensors; smaller maps are padded with
+    terminal dummy states so mixed sizes share one batch. Each sweep is a
+    single array program over all maps that have not converged yet.
+    """
+    def __init__(self, map_layouts, is_slippery=False, gamma=0.9):
+        self.map_layouts = list(map_layouts)
+        self.n_maps = len(self.map_layouts)
+        self.n_actions = 4
+        self.map_sizes = [len(layout) * len(layout[0]) for layout in self.map_layouts]
+        self.n_states = max(self.map_sizes)
+        # Per-map discount factors, so a batch can also sweep over gamma
+        self.gamma = np.broadcast_to(np.asarray(gamma, dtype=float), (self.n_maps,)).copy()
+        shape = (self.n_maps, self.n_states, self.n_actions)
+        # Padding states loop onto themselves with probability 0 and are terminal
+        self.next_states = np.broadcast_to(np.arange(self.n_states)[None, :, None, None], shape + (3,)).copy()
+        self.probs = np.zeros(shape + (3,))
+        self.R = np.zeros(shape)
+        self.terminal = np.ones((self.n_maps, self.n_states), dtype=bool)
+        for b, layout in enumerate(self.map_layouts):
+            n = self.map_sizes[b]
+            next_states, probs, self.R[b, :n], self.terminal[b, :n] = build_transition_model(layout, is_slippery)
+            n_successors = next_states.shape[2]
+            self.next_states[b, :n, :, :n_successors] = next_states
+            self.probs[b, :n, :, :n_successors] = probs
+        self.value_tables = np.zeros((self.n_maps, self.n_states))
+    def compute_q_values(self, value_tables, maps=None):
+        """
+        Q-values of shape (len(maps), S, A) for the given maps (all by default),
+        with value_tables holding one row per selected map.
+        """
+        if maps is None:
+            maps = np.arange(self.n_maps)
+        # Offset each map's successor indices into the flattened value tables
+        offsets = (np.arange(len(maps)) * self.n_states)[:, None, None, None]
+        flat_next = self.next_states[maps] + offsets
+        expected_next = np.sum(self.probs[maps] * value_tables.ravel()[flat_next], axis=3)
+        return self.R[maps] + self.gamma[maps, None, None] * expected_next
+    def compute_value_iteration(self, tolerance=1e-8, max_iterations=100000):
+        """
+        Runs synchronous sweeps until every map's max-norm change is below
+        tolerance. Converged maps are dropped from the working set, so late
+        sweeps only pay for the maps that are still moving. Returns the
+        per-map number of sweeps.
+        """
+        self.iterations = np.zeros(self.n_maps, dtype=int)
+        active = np.arange(self.n_maps)
+        # Working copies of the active maps, re-gathered only when the set shrinks
+        offsets = (np.arange(len(active)) * self.n_states)[:, None, None, None]
+        flat_next, probs, rewards = self.next_states + offsets, self.probs, self.R
+        gamma, terminal, values = self.gamma[:, None, None], self.terminal, self.value_tables.copy()
+        for _ in range(max_iterations):
+            expected_next = np.sum(probs * values.ravel()[flat_next], axis=3)
+            new_values = np.where(terminal, values, (rewards + gamma * expected_next).max(axis=2))
+            delta = np.max(np.abs(new_values - values), axis=1)
+            values = new_values
+            self.iterations[active] += 1
+            converged = delta < tolerance
+            if converged.any():
+                self.value_tables[active[converged]] = values[converged]
+                keep = ~converged
+                # Shrink the tables with the active set, so the final write
+                # below also lines up when the last maps converge together
+                active, values = active[keep], values[keep]
+                if len(active) == 0:
+                    break
+                offsets = (np.arange(len(active)) * self.n_states)[:, None, None, None]
+                flat_next = self.next_states[active] + offsets
+                probs, rewards = self.probs[active], self.R[active]
+                gamma, terminal = self.gamma[active, None, None], self.terminal[active]
+        self.value_tables[active] = values
+        return self.iterations
+    def results(self):
+        """
+        Per-map value tables and greedy policies, trimmed to each map's size.
+        """
+        policies = greedy_actions(self.compute_q_values(self.value_tables))
+        return ([self.value_tables[b, :n].copy() for b, n in enumerate(self.map_sizes)],
+                [policies[b, :n].copy() for b, n in enumerate(self.map_sizes)])
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from async_value_iteration import AsynchronousValueIteration, PrioritizedSweepingValueIteration
+from parallel_value_iteration import ParallelValueIteration
+from value_iteration import ValueIteration
+from value_iteration_pygame import CustomFrozenLake
+# Largest map side each solver is run on; the pure-Python loops and the
+# dense S x A x S tensor become impractical well before 1024x1024
+SOLVERS = {
+    "sync_loop": 64,
+    "sync_vectorized": 1024,
+    "async_loop": 128,
+    "async_numba": 1024,
+    "async_red_black": 1024,
+    "async_goal_outward": 1024,
+    "async_prioritized": 128,
+    "gym_dense": 32,
+    "gym_sparse": 1024,
+    "gym_numba": 1024,
+    "gym_parallel": 1024,
+}
+# Grid solvers only model deterministic moves
+DETERMINISTIC_ONLY = ("sync_loop", "sync_vectorized", "async_loop", "async_numba", "async_red_black",
+                      "async_goal_outward", "async_prioritized")
+SIZES = (4, 8, 16, 32, 64, 128, 256, 512, 1024)
+def random_map(size, hole_fraction=0.2, seed=0):
+    # Start in the top-left and goal in the bottom-right corner. Instead of
+    # gymnasium's path check, which would dominate setup time on large maps,
+    # a random staircase of right and down moves is cleared from S to G, so
+    # the goal is always reachable
+    rng = np.random.default_rng(seed)
+    tiles = np.where(rng.random((size, size)) < hole_fraction, "H", "F")
+    downs = np.concatenate([[0], np.cumsum(rng.permutation(np.repeat([0, 1], size - 1)))])
+    tiles[downs, np.arange(2 * size - 1) - downs] = "F"
+    tiles[0, 0], tiles[-1, -1] = "S", "G"
+    return ["".join(row) for row in tiles]
+def grid_arguments(map_layout):
+    # FrozenLake holes become pits of a wall-free grid world
+    desc = np.asarray(map_layout, dtype="c")
+    return {"shape": desc.shape, "goal_pos": desc == b"G", "pit_pos": desc == b"H", "wall_pos": []}
+def warm_up(solver, is_slippery):
+    if solver == "async_numba":
+        AsynchronousValueIteration(backend="numba", **grid_arguments(random_map(4))).run_value_iteration(max_iterations=1)
+    else:
+        CustomFrozenLake(random_map(4), is_slippery=is_slippery, backend="numba").compute_value_iteration()
+def run_case(solver, size, is_slippery, tolerance, gamma, seed):
+    """
+    Solves one map with one solver and returns sweeps, wall time, peak RSS
+    and backups/sec. Meant to run in a fresh process so peak RSS is per case.
+    """
+    map_layout = random_map(size, seed=seed)
+    if solver in ("async_numba", "gym_numba"):
+        # Compile (or load from cache) the numba kernels on a throwaway map,
+        # so solve_time measures the sweeps rather than the JIT
+        warm_up(solver, is_slippery)
+    start = time.perf_counter()
+    if solver in ("sync_loop", "sync_vectorized"):
+        agent = ValueIteration(discount_factor=gamma, vectorized=solver == "sync_vectorized", **grid_arguments(map_layout))
+        report = agent.run_value_iteration(iterations=10 ** 6, delta_e=tolerance).report()
+    elif solver in ("async_loop", "async_numba", "async_red_black", "async_goal_outward"):
+        ordering = {"async_red_black": "red_black", "async_goal_outward": "goal_outward"}.get(solver, "row_major")
+        backend = "numba" if solver == "async_numba" else "numpy"
+        agent = AsynchronousValueIteration(discount_factor=gamma, ordering=ordering, backend=backend,
+                                           **grid_arguments(map_layout))
+        report = agent.run_value_iteration(max_iterations=10 ** 6, delta_threshold=tolerance).report()
+    elif solver == "async_prioritized":
+        agent = PrioritizedSweepingValueIteration(discount_factor=gamma, **grid_arguments(map_layout))
+        report = agent.run_value_iteration(max_iterations=10 ** 6, delta_threshold=tolerance).report()
+    else:
+        agent = CustomFrozenLake(map_layout, is_slippery=is_slippery, sparse=solver != "gym_dense",
+                                 backend="numba" if solver == "gym_numba" else "numpy")
+        agent.gamma = gamma
+        runner = ParallelValueIteration(agent) if solver == "gym_parallel" else agent
+        report = runner.compute_value_iteration(tolerance=tolerance).report()
+    return {
+        "solver": solver, "size": size, "is_slippery": is_slippery, "tolerance": tolerance, "gamma": gamma,
+        "sweeps": report["sweeps"], "solve_time": report["wall_time"], "backups_per_sec": report["backups_per_sec"],
+        # Includes model construction, which dominates for some solvers
+        "total_time": time.perf_counter() - start,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+def compare(previous, results):
+    # Ratio > 1 means the case got slower since the previous recorded run
+    baseline = {(r["solver"], r["size"], r["is_slippery"]): r for r in previous["results"]}
+    for result in results:
+        old = baseline.get((result["solver"], result["size"], result["is_slippery"]))
+        if old and old["solve_time"]:
+            ratio = result["solve_time"] / old["solve_time"]
+            flag = "  <-- slower" if ratio > 1.2 else ""
+            print(f"{result['solver']:>18} {result['size']:>5} slippery={result['is_slippery']!s:<5} "
+                  f"{ratio:6.2f}x vs {previous['commit']}{flag}")
+def run_benchmarks(solvers, sizes, tolerance=1e-6, gamma=0.9, seed=0, history="benchmark_history.json"):
+    """
+    Runs every applicable (solver, size, slipperiness) case, each in its own
+    process, appends the run to the JSON history file and prints a
+    comparison with the previous entry.
+    """
+    results = []
+    for solver in solvers:
+        for size in sizes:
+            if size > SOLVERS[solver]:
+                continue
+            for is_slippery in ((False,) if solver in DETERMINISTIC_ONLY else (False, True)):
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    result = executor.submit(run_case, solver, size, is_slippery, tolerance, gamma, seed).result()
+                results.append(result)
+                print(f"{solver:>18} {size:>5}x{size:<5} slippery={is_slippery!s:<5} sweeps={result['sweeps']:<6} "
+                      f"solve={result['solve_time']:.4f}s total={result['total_time']:.4f}s "
+                      f"rss={result['peak_rss_mb']:.0f}MB backups/s={result['backups_per_sec'] or 0:.3g}")
+    runs = load_history(history)
+    if runs:
+        compare(runs[-1], results)
+    runs.append({
+        "commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(), "numpy": np.__version__, "results": results,
+    })
+    with open(history, "w") as f:
+        json.dump(runs, f, indent=1)
+    return results
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the value iteration solvers across map sizes.")
+    parser.add_argument("--solvers", nargs="+", choices=sorted(SOLVERS), default=list(SOLVERS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--gamma", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default="benchmark_history.json")
+    args = parser.parse_args()
+    run_benchmarks(args.solvers, args.sizes, args.tolerance, args.gamma, args.seed, args.history)
@@ -0,0 +1,89 @@
+import argparse
+import time
+import numpy as np
+from sweep_runner import load_map
+from value_iteration_pygame import CustomFrozenLake
+def rescale_values(value_table, gamma_from, gamma_to):
+    """
+    Starting table for gamma_to from one solved at gamma_from. FrozenLake's
+    only reward is 1 for reaching the goal, so a deterministic value is
+    gamma ** (steps - 1) and raising it to log(gamma_to) / log(gamma_from)
+    is exact; slippery tables are mapped the same way as an approximation.
+    """
+    exponent = np.log(gamma_to) / np.log(gamma_from)
+    return np.where(value_table > 0, np.maximum(value_table, 0) ** exponent, value_table)
+WARM_STARTS = ("power", "policy", "previous")
+def solve_gamma_schedule(map_layout, gammas, is_slippery=False, tolerance=1e-8, warm_start=None,
+                         compare_cold=True, **agent_kwargs):
+    """
+    Solves one map for every gamma in increasing order, seeding each solve
+    from the previous one instead of zeros: "power" rescales the previous
+    table with rescale_values, "policy" evaluates the previous greedy policy
+    exactly at the new gamma (a lower bound on the new values) and
+    "previous" reuses the table as is. The default is "power" for
+    deterministic maps, where it is exact, and "policy" for slippery ones,
+    where the rescaled table overshoots and takes longer to come down than
+    a cold start. With compare_cold=True every gamma is also solved from
+    zeros for reference. Returns one dict per gamma with the warm and cold
+    sweep counts and wall times; the warm wall_time leaves out building the
+    starting table, which is reported as seed_time.
+    """
+    if warm_start is None:
+        warm_start = "policy" if is_slippery else "power"
+    if warm_start not in WARM_STARTS:
+        raise ValueError(f"Unknown warm_start {warm_start!r}, expected one of {WARM_STARTS}")
+    agent = CustomFrozenLake(map_layout, is_slippery=is_slippery, **agent_kwargs)
+    cold_agent = CustomFrozenLake(map_layout, is_slippery=is_slippery, **agent_kwargs) if compare_cold else None
+    results = []
+    previous_gamma = None
+    for gamma in sorted(gammas):
+        start = time.perf_counter()
+        if previous_gamma is not None and warm_start == "power":
+            agent.value_table = rescale_values(agent.value_table, previous_gamma, gamma)
+        elif previous_gamma is not None and warm_start == "policy":
+            # The greedy policy is taken under the old gamma, before switching
+            policy = agent.policy
+            agent.gamma = gamma
+            agent.value_table = agent.evaluate_policy(policy).astype(agent.dtype)
+        agent.gamma = gamma
+        seed_time = time.perf_counter() - start
+        warm = agent.compute_value_iteration(tolerance=tolerance)
+        result = {"gamma": gamma, "sweeps": warm.sweeps, "wall_time": warm.wall_time, "seed_time": seed_time}
+        if cold_agent is not None:
+            cold_agent.gamma = gamma
+            cold_agent.value_table = np.zeros(cold_agent.n_states, dtype=cold_agent.dtype)
+            cold = cold_agent.compute_value_iteration(tolerance=tolerance)
+            result.update(cold_sweeps=cold.sweeps, cold_wall_time=cold.wall_time,
+                          max_difference=float(np.max(np.abs(agent.value_table - cold_agent.value_table))))
+        results.append(result)
+        previous_gamma = gamma
+    return results
+def print_report(results):
+    # Warm times include seeding the starting table, so both columns are end to end
+    for result in results:
+        line = (f"gamma={result['gamma']:<7} {result['sweeps']:>7} sweeps "
+                f"{result['seed_time'] + result['wall_time']:8.3f}s (seed {result['seed_time']:.3f}s)")
+        if "cold_sweeps" in result:
+            line += f"  (cold start: {result['cold_sweeps']:>7} sweeps {result['cold_wall_time']:8.3f}s)"
+        print(line)
+    total = sum(result["sweeps"] for result in results)
+    total_time = sum(result["seed_time"] + result["wall_time"] for result in results)
+    if all("cold_sweeps" in result for result in results):
+        cold_total = sum(result["cold_sweeps"] for result in results)
+        cold_time = sum(result["cold_wall_time"] for result in results)
+        print(f"Total: {total} sweeps {total_time:.3f}s warm vs {cold_total} sweeps {cold_time:.3f}s cold "
+              f"({total / max(cold_total, 1):.1%} of the sweeps, {total_time / cold_time if cold_time else 0:.1%} of the time)")
+    else:
+        print(f"Total: {total} sweeps {total_time:.3f}s")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve one FrozenLake map over increasing gammas with warm starts.")
+    parser.add_argument("map_file", help="text file with one map row per line")
+    parser.add_argument("--gammas", nargs="+", type=float, default=[0.5, 0.9, 0.99, 0.999])
+    parser.add_argument("--slippery", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1e-8)
+    parser.add_argument("--warm-start", choices=WARM_STARTS, default=None,
+                        help="default: power for deterministic maps, policy for slippery ones")
+    parser.add_argument("--no-cold", dest="compare_cold", action="store_false", help="skip the cold-start reference solves")
+    args = parser.parse_args()
+    print_report(solve_gamma_schedule(load_map(args.map_file), args.gammas, args.slippery, args.tolerance,
+                                      args.warm_start, args.compare_cold, sparse=True))
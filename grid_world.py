@@ -0,0 +1,36 @@
+import numpy as np
+class GridWorld:
+    """
+    Layout shared by ValueIteration and AsynchronousValueIteration: an
+    N x M grid with any number of goals, pits and walls, each stored as a
+    boolean mask so membership tests are single array lookups.
+    Positions can be given as one (row, col) pair, a collection of pairs or
+    a boolean mask of the grid's shape.
+    """
+    def __init__(self, shape=(3, 3), goals=(0, 2), pits=(1, 2), walls=(1, 1)):
+        self.shape = tuple(shape)
+        self.goal = self.make_mask(goals)
+        self.pit = self.make_mask(pits)
+        self.wall = self.make_mask(walls)
+        if (self.goal & self.pit).any() or ((self.goal | self.pit) & self.wall).any():
+            raise ValueError("Goals, pits and walls must not overlap")
+        # Cells whose values are never backed up
+        self.fixed = self.goal | self.pit | self.wall
+    def make_mask(self, positions):
+        if isinstance(positions, np.ndarray) and positions.dtype == bool:
+            if positions.shape != self.shape:
+                raise ValueError(f"Mask of shape {positions.shape} does not match grid shape {self.shape}")
+            return positions.copy()
+        positions = np.asarray(positions, dtype=int).reshape(-1, 2)
+        rows, cols = positions[:, 0], positions[:, 1]
+        if ((rows < 0) | (rows >= self.shape[0]) | (cols < 0) | (cols >= self.shape[1])).any():
+            raise ValueError(f"Positions {positions.tolist()} are outside the {self.shape} grid")
+        mask = np.zeros(self.shape, dtype=bool)
+        mask[rows, cols] = True
+        return mask
+    def initial_value_table(self, goal_value=1.0, pit_value=-1.0):
+        # Walls are not reachable, so they stay 0
+        value_table = np.zeros(self.shape)
+        value_table[self.goal] = goal_value
+        value_table[self.pit] = pit_value
+        return value_table
@@ -0,0 +1,75 @@
+import importlib.util
+import numpy as np
+# numba is only imported once a compiled kernel is first requested, so the
+# NumPy backends (and headless or worker processes) never pay for it; the
+# kernels below stay runnable as plain Python either way
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+prange = range
+compiled_kernels = {}
+def compiled(kernel):
+    """
+    The numba-compiled version of one of the kernels in this module, built
+    on first use (or loaded from numba's on-disk cache).
+    """
+    global prange
+    if kernel.__name__ not in compiled_kernels:
+        import numba
+        # Resolved when the kernel is compiled, so parallel loops use prange
+        prange = numba.prange
+        compiled_kernels[kernel.__name__] = numba.njit(cache=True, parallel=kernel is csr_sync_sweep)(kernel)
+    return compiled_kernels[kernel.__name__]
+def async_sweep(values, successors, states, immediate_reward, discount_factor):
+    """
+    In-place Gauss-Seidel sweep over flat state indices in the given order,
+    the compiled counterpart of AsynchronousValueIteration's row-major loop.
+    Returns the smallest and largest signed change (inf and -inf for no
+    states), so a span rule can use them and tiles swept separately can be
+    combined.
+    """
+    lowest = np.inf
+    highest = -np.inf
+    for n in range(states.shape[0]):
+        s = states[n]
+        best = -np.inf
+        for a in range(successors.shape[1]):
+            expected_value = immediate_reward + discount_factor * values[successors[s, a]]
+            if expected_value > best:
+                best = expected_value
+        change = best - values[s]
+        values[s] = best
+        if change < lowest:
+            lowest = change
+        if change > highest:
+            highest = change
+    return lowest, highest
+def csr_sync_sweep(values, new_values, row_start, columns, data, rewards, terminal, n_actions, gamma):
+    """
+    One synchronous Bellman sweep over a CSR transition model whose rows are
+    (state, action) pairs in state-major order, parallel across states.
+    Writes into new_values; the caller measures the change.
+    """
+    n_states = values.shape[0]
+    for s in prange(n_states):
+        if terminal[s]:
+            new_values[s] = values[s]
+            continue
+        best = -np.inf
+        for a in range(n_actions):
+            row = s * n_actions + a
+            expected_next = 0.0
+            for k in range(row_start[row], row_start[row + 1]):
+                expected_next += data[k] * values[columns[k]]
+            q_value = rewards[s, a] + gamma * expected_next
+            if q_value > best:
+                best = q_value
+        new_values[s] = best
+def successors_to_csr(next_states, probs):
+    """
+    CSR arrays (row_start, columns, data) of the (S * A) x S transition
+    matrix given (S, A, K) successor/probability arrays, dropping padding.
+    """
+    n_states, n_actions, n_successors = next_states.shape
+    keep = probs.reshape(-1, n_successors) > 0
+    row_start = np.zeros(n_states * n_actions + 1, dtype=np.int64)
+    np.cumsum(keep.sum(axis=1), out=row_start[1:])
+    return row_start, next_states.reshape(-1, n_successors)[keep].astype(np.int64), probs.reshape(-1, n_successors)[keep]
@@ -0,0 +1,134 @@
+import os
+import numpy as np
+from numpy.lib.format import open_memmap
+from stopping_criteria import StoppingCriteria
+from value_iteration_pygame import CustomFrozenLake, build_transition_model, greedy_actions
+class OutOfCoreFrozenLake(CustomFrozenLake):
+    """
+    CustomFrozenLake for maps whose model does not fit in memory. The sparse
+    transition arrays and both value buffers are .npy files in `directory`,
+    opened as np.memmap, and every pass works on block_rows map rows at a
+    time, so working memory is bounded by the block size rather than the
+    map. The solved table is left in directory/value_table.npy, which later
+    runs can open instantly with np.load(path, mmap_mode="r").
+    """
+    def __init__(self, map_layout, is_slippery=False, directory="out_of_core", block_rows=64, dtype=np.float64):
+        self.directory = directory
+        self.block_rows = block_rows
+        super().__init__(map_layout, is_slippery=is_slippery, sparse=True, dtype=dtype)
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.npy")
+    def initial_value_table(self):
+        # A fresh memmap file reads as zeros, so nothing is written up front
+        os.makedirs(self.directory, exist_ok=True)
+        return open_memmap(self.path("initial_table"), mode="w+", dtype=self.dtype, shape=(self.n_states,))
+    def cast_value_table(self, dtype):
+        # Copied block by block into a new memory-mapped file
+        table = open_memmap(self.path(f"value_table_{np.dtype(dtype).name}"), mode="w+", dtype=dtype,
+                            shape=(self.n_states,))
+        for lo, hi in self.blocks():
+            table[lo:hi] = self.value_table[lo:hi]
+        table.flush()
+        return table
+    def blocks(self):
+        # Flat state ranges of consecutive groups of block_rows map rows
+        for top in range(0, self.n_rows, self.block_rows):
+            yield top * self.n_cols, min(top + self.block_rows, self.n_rows) * self.n_cols
+    def compile_transition_model(self):
+        """
+        Writes next_states, probs, R and terminal to memory-mapped .npy files
+        block by block. Each block is built by build_transition_model from
+        its rows plus one halo row on either side, which holds every
+        successor of the block, so the result equals the in-memory model.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.n_rows, self.n_cols = len(self.map_layout), len(self.map_layout[0])
+        shape = (self.n_states, self.n_actions, 3 if self.is_slippery else 1)
+        index_dtype = np.int32 if self.n_states < 2 ** 31 else np.int64
+        self.next_states = open_memmap(self.path("next_states"), mode="w+", dtype=index_dtype, shape=shape)
+        self.probs = open_memmap(self.path("probs"), mode="w+", dtype=self.dtype, shape=shape)
+        self.R = open_memmap(self.path("rewards"), mode="w+", dtype=self.dtype, shape=shape[:2])
+        self.terminal = open_memmap(self.path("terminal"), mode="w+", dtype=bool, shape=shape[:1])
+        self.max_reward = 0.0
+        for lo, hi in self.blocks():
+            top, bottom = max(lo // self.n_cols - 1, 0), min(hi // self.n_cols + 1, self.n_rows)
+            next_states, probs, rewards, terminal = build_transition_model(self.map_layout[top:bottom], self.is_slippery)
+            keep = slice(lo - top * self.n_cols, hi - top * self.n_cols)
+            self.next_states[lo:hi] = next_states[keep] + top * self.n_cols
+            self.probs[lo:hi] = probs[keep]
+            self.R[lo:hi] = rewards[keep]
+            self.terminal[lo:hi] = terminal[keep]
+            self.max_reward = max(self.max_reward, np.abs(rewards[keep]).max(initial=0.0))
+        for array in (self.next_states, self.probs, self.R, self.terminal):
+            array.flush()
+        self.start_states = np.flatnonzero(np.asarray(self.map_layout, dtype="c").ravel() == b"S")
+    def reward_bound(self):
+        # Recorded while compiling, so the precision guard does not read R whole
+        return self.max_reward
+    def backup_block(self, value_table, lo, hi):
+        """
+        Q-values of states lo:hi. Successors are at most one map row away, so
+        only that window of the value table is read.
+        """
+        start, stop = max(lo - self.n_cols, 0), min(hi + self.n_cols, self.n_states)
+        window = np.asarray(value_table[start:stop])
+        expected_next = np.sum(self.probs[lo:hi] * window[self.next_states[lo:hi] - start], axis=2)
+        return self.R[lo:hi] + self.gamma * expected_next
+    def greedy_policy(self):
+        # Written to directory/policy.npy block by block
+        policy = open_memmap(self.path("policy"), mode="w+", dtype=np.int8, shape=(self.n_states,))
+        for lo, hi in self.blocks():
+            policy[lo:hi] = greedy_actions(self.backup_block(self.value_table, lo, hi))
+        policy.flush()
+        return policy
+    def update_tiles(self, tiles, tolerance=1e-8, max_sweeps=1000):
+        # Patching rows and re-solving in place would need the whole model and
+        # a writable table in memory; rebuild with a new OutOfCoreFrozenLake
+        raise ValueError("OutOfCoreFrozenLake does not support update_tiles; build a new agent for the edited map")
+    def compute_value_iteration(self, tolerance=1e-8, stopping=(), time_budget=None, on_sweep=None):
+        """
+        Synchronous value iteration streamed over row blocks, ping-ponging
+        between two memory-mapped buffers. Supports the "span" and "time"
+        rules; "policy" would need the whole policy in memory. Returns the
+        usual StoppingCriteria record and leaves value_table memory-mapped
+        from directory/value_table.npy.
+        """
+        if "policy" in stopping:
+            raise ValueError("Out-of-core value iteration supports only the 'span' and 'time' stopping rules")
+        self.ensure_precision(tolerance)
+        self.stopping = StoppingCriteria(tolerance, self.gamma, stopping, time_budget=time_budget)
+        paths = [self.path("buffer_0"), self.path("buffer_1")]
+        buffers = [open_memmap(path, mode="w+", dtype=self.dtype, shape=(self.n_states,)) for path in paths]
+        for lo, hi in self.blocks():
+            buffers[0][lo:hi] = self.value_table[lo:hi]
+        current = 0
+        updatable = 0
+        for lo, hi in self.blocks():
+            updatable += int(np.count_nonzero(~self.terminal[lo:hi]))
+        while True:
+            source, target = buffers[current], buffers[1 - current]
+            lowest, highest = np.inf, -np.inf
+            for lo, hi in self.blocks():
+                old = np.asarray(source[lo:hi])
+                new = np.where(self.terminal[lo:hi], old, self.backup_block(source, lo, hi).max(axis=1))
+                target[lo:hi] = new
+                diff = new - old
+                moving = ~self.terminal[lo:hi]
+                lowest = min(lowest, np.min(diff, where=moving, initial=np.inf))
+                highest = max(highest, np.max(diff, where=moving, initial=-np.inf))
+            done = self.stopping.check_extremes(lowest, highest)
+            current = 1 - current
+            if on_sweep is not None:
+                table_view = buffers[current].view()
+                table_view.flags.writeable = False
+                on_sweep(self.stopping.sweeps, self.stopping.delta, table_view)
+            if done:
+                break
+        for buffer in buffers:
+            buffer.flush()
+        del source, target, buffers
+        os.replace(paths[current], self.path("value_table"))
+        os.remove(paths[1 - current])
+        self.value_table = np.load(self.path("value_table"), mmap_mode="r")
+        self.stopping.finish(self.stopping.sweeps * updatable)
+        return self.stopping
@@ -0,0 +1,86 @@
+import os
+import threading
+import numpy as np
+from stopping_criteria import StoppingCriteria
+from value_iteration_pygame import greedy_actions
+class ParallelValueIteration:
+    """
+    Synchronous value iteration for a CustomFrozenLake split across threads.
+    The states are partitioned into contiguous blocks, one per worker; each
+    worker backs up its block with NumPy kernels (which release the GIL),
+    then all workers meet at a barrier whose action reduces the per-block
+    extremes of the change, applies the stopping rules and swaps the two
+    value buffers for the next sweep.
+    """
+    def __init__(self, agent, n_workers=None):
+        self.agent = agent
+        self.n_workers = max(1, min(n_workers or os.cpu_count() or 1, agent.n_states))
+        bounds = np.linspace(0, agent.n_states, self.n_workers + 1).astype(int)
+        self.blocks = list(zip(bounds[:-1], bounds[1:]))
+    def sweep_block(self, worker, source, target, policy):
+        agent = self.agent
+        lo, hi = self.blocks[worker]
+        scratch, q_values, diff = self.scratch[worker], self.q_values[worker], self.diff[worker]
+        # mode="clip" gathers straight into scratch instead of via a temporary
+        np.take(source, agent.next_states[lo:hi], out=scratch, mode="clip")
+        np.multiply(scratch, agent.probs[lo:hi], out=scratch)
+        np.sum(scratch, axis=2, out=q_values)
+        q_values *= agent.gamma
+        q_values += agent.R[lo:hi]
+        np.max(q_values, axis=1, out=target[lo:hi])
+        np.copyto(target[lo:hi], source[lo:hi], where=agent.terminal[lo:hi])
+        np.subtract(target[lo:hi], source[lo:hi], out=diff)
+        moving = self.moving[worker]
+        self.lowest[worker] = np.min(diff, where=moving, initial=np.inf)
+        self.highest[worker] = np.max(diff, where=moving, initial=-np.inf)
+        if policy is not None:
+            policy[lo:hi] = greedy_actions(q_values)
+    def compute_value_iteration(self, tolerance=1e-8, stopping=(), policy_patience=5, time_budget=None,
+                                max_iterations=10 ** 6):
+        """
+        Same stopping rules and StoppingCriteria record as
+        CustomFrozenLake.compute_value_iteration; the result is written back
+        to agent.value_table.
+        """
+        agent = self.agent
+        agent.ensure_precision(tolerance)
+        self.stopping = StoppingCriteria(tolerance, agent.gamma, stopping, policy_patience, time_budget)
+        buffers = [np.array(agent.value_table, dtype=agent.dtype), np.empty(agent.n_states, dtype=agent.dtype)]
+        # Per-worker gather, Q-value and change buffers, reused every sweep
+        self.scratch = [np.empty((hi - lo,) + agent.next_states.shape[1:], dtype=agent.dtype) for lo, hi in self.blocks]
+        self.q_values = [np.empty((hi - lo, agent.n_actions), dtype=agent.dtype) for lo, hi in self.blocks]
+        self.diff = [np.empty(hi - lo, dtype=agent.dtype) for lo, hi in self.blocks]
+        self.moving = [~agent.terminal[lo:hi] for lo, hi in self.blocks]
+        policy = np.zeros(agent.n_states, dtype=int) if self.stopping.needs_policy else None
+        self.lowest = np.zeros(self.n_workers)
+        self.highest = np.zeros(self.n_workers)
+        self.current = 0
+        self.done = False
+        errors = []
+        def after_sweep():
+            # Runs in exactly one thread once every block of the sweep is written
+            done = self.stopping.check_extremes(self.lowest.min(), self.highest.max(),
+                                                None if policy is None else policy.copy())
+            self.current = 1 - self.current
+            self.done = done or self.stopping.sweeps >= max_iterations
+        barrier = threading.Barrier(self.n_workers, action=after_sweep)
+        def work(worker):
+            try:
+                while not self.done:
+                    self.sweep_block(worker, buffers[self.current], buffers[1 - self.current], policy)
+                    barrier.wait()
+            except threading.BrokenBarrierError:
+                pass
+            except Exception as error:
+                errors.append(error)
+                barrier.abort()
+        threads = [threading.Thread(target=work, args=(worker,)) for worker in range(self.n_workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        agent.value_table = buffers[self.current]
+        self.stopping.finish(self.stopping.sweeps * int(np.count_nonzero(~agent.terminal)))
+        return self.stopping
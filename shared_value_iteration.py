@@ -0,0 +1,128 @@
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from async_value_iteration import AsynchronousValueIteration
+from numba_kernels import NUMBA_AVAILABLE, async_sweep, compiled
+from stopping_criteria import StoppingCriteria
+def sweep_tile(worker, table_name, status_name, shape, n_workers, successors, states, immediate_reward,
+               discount_factor, stop, epoch, status_lock):
+    """
+    Worker process: repeatedly sweeps its own tile of the shared value table
+    in place, reading the neighbouring tiles' live values without locks.
+    After each pass it folds the tile's smallest and largest change into row
+    `worker` of the shared status array, bumps its pass count and records
+    the epoch the pass started in.
+    """
+    table_memory = shared_memory.SharedMemory(name=table_name)
+    status_memory = shared_memory.SharedMemory(name=status_name)
+    values = np.ndarray(shape, dtype=float, buffer=table_memory.buf).ravel()
+    status = np.ndarray((n_workers, 4), dtype=float, buffer=status_memory.buf)
+    sweep = compiled(async_sweep) if NUMBA_AVAILABLE else async_sweep
+    try:
+        while not stop.is_set():
+            started = epoch.value
+            lowest, highest = sweep(values, successors, states, immediate_reward, discount_factor)
+            # Only the bookkeeping is locked, once per pass, so the coordinator
+            # never resets a row between a worker's read and write of it
+            with status_lock:
+                status[worker, 0] = min(status[worker, 0], lowest)
+                status[worker, 1] = max(status[worker, 1], highest)
+                status[worker, 2] += 1
+                status[worker, 3] = started
+    finally:
+        del values, status
+        table_memory.close()
+        status_memory.close()
+class SharedMemoryValueIteration(AsynchronousValueIteration):
+    """
+    Asynchronous value iteration across processes by chaotic relaxation: the
+    value table lives in multiprocessing.shared_memory and every worker
+    sweeps its own band of rows in place, lock-free. The parent process
+    counts a sweep each time every worker has completed a pass that started
+    after the previous count, and applies the stopping rules to the extremes
+    of change the workers accumulated in the shared status array meanwhile.
+    """
+    def __init__(self, *args, n_workers=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Every worker runs the row-major async_sweep kernel over its own tile
+        if self.ordering != "row_major" or self.backend != "numpy":
+            raise ValueError("Shared-memory value iteration always sweeps its tiles row-major; ordering and backend cannot be set")
+        self.n_workers = n_workers or multiprocessing.cpu_count()
+    def run_value_iteration(self, max_iterations=100, delta_threshold=0.0001, stopping=(), policy_patience=5, time_budget=None, on_sweep=None):
+        """
+        Same arguments and StoppingCriteria record as
+        AsynchronousValueIteration.run_value_iteration. Workers run freely,
+        so one counted sweep can span several passes over some tiles.
+        """
+        self.print_start("Shared-Memory Asynchronous Value Iteration")
+        self.build_model()
+        tiles = [tile for tile in np.array_split(self.states, self.n_workers) if len(tile)]
+        self.stopping = StoppingCriteria(delta_threshold, self.discount_factor, stopping, policy_patience, time_budget)
+        table_memory = shared_memory.SharedMemory(create=True, size=self.value_table.nbytes)
+        status_memory = shared_memory.SharedMemory(create=True, size=len(tiles) * 4 * 8)
+        # Forking a process that has started threads (numba's parallel pool,
+        # ParallelValueIteration) can deadlock, so workers never fork from it
+        context = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+        stop, epoch, status_lock = context.Event(), context.Value("q", 0), context.Lock()
+        # While running, value_table is the live shared table, so printing,
+        # greedy_policy and table_view see the workers' latest values
+        values = np.ndarray(self.value_table.shape, dtype=float, buffer=table_memory.buf)
+        values[:] = self.value_table
+        self.value_table = values
+        # Per worker: lowest and highest change since the last count, passes, start epoch of the latest pass
+        status = np.ndarray((len(tiles), 4), dtype=float, buffer=status_memory.buf)
+        status[:] = 0.0
+        status[:, 0], status[:, 1], status[:, 3] = np.inf, -np.inf, -1
+        workers = []
+        try:
+            for worker, tile in enumerate(tiles):
+                process = context.Process(target=sweep_tile, daemon=True, args=(
+                    worker, table_memory.name, status_memory.name, values.shape, len(tiles), self.successors, tile,
+                    self.immediate_reward, self.discount_factor, stop, epoch, status_lock))
+                process.start()
+                workers.append(process)
+            previous_lowest, previous_highest = np.inf, -np.inf
+            for iteration in range(1, max_iterations + 1):
+                while status[:, 3].min() < epoch.value:
+                    if not all(process.is_alive() for process in workers):
+                        raise RuntimeError("A shared-memory value iteration worker exited unexpectedly")
+                    time.sleep(0.0005)
+                with status_lock:
+                    lowest, highest = status[:, 0].min(), status[:, 1].max()
+                    status[:, 0], status[:, 1] = np.inf, -np.inf
+                    epoch.value += 1
+                # Passes still running at the reset are only counted at the next
+                # sweep, so each sweep is judged together with the previous one
+                window = min(lowest, previous_lowest), max(highest, previous_highest)
+                previous_lowest, previous_highest = lowest, highest
+                policy = self.greedy_policy() if self.stopping.needs_policy else None
+                done = self.stopping.check_extremes(*window, policy)
+                if self.verbose >= 2:
+                    print(f"Iteration {iteration} (Max Delta: {self.stopping.delta:.6f}):")
+                    self.print_value_table()
+                if on_sweep is not None:
+                    on_sweep(iteration, self.stopping.delta, self.table_view())
+                if done:
+                    if self.verbose >= 1:
+                        print(f"\nConverged in {iteration} iterations.")
+                    break
+            stop.set()
+            for process in workers:
+                process.join()
+            self.backups = int(sum(status[worker, 2] * len(tile) for worker, tile in enumerate(tiles)))
+        finally:
+            stop.set()
+            for process in workers:
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+            self.value_table = values.copy()
+            del values, status
+            table_memory.close()
+            table_memory.unlink()
+            status_memory.close()
+            status_memory.unlink()
+        self.stopping.finish(self.backups)
+        self.print_summary()
+        return self.stopping
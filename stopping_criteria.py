@@ -0,0 +1,127 @@
+import math
+import time
+import numpy as np
+class StoppingCriteria:
+    """
+    Stopping rules shared by the value iteration solvers. The max-norm rule
+    (largest change below the tolerance) is always active; "span", "policy"
+    and "time" can be selected on top of it. After a run, `fired` names the
+    rule that stopped it and `sweeps_saved` estimates how many more sweeps
+    the max-norm rule alone would have needed, from the contraction of the
+    change over the last few sweeps; report() gives the full per-run record.
+    """
+    CRITERIA = ("span", "policy", "time")
+    # Sweeps over which the contraction rate of the change is measured
+    RATE_WINDOW = 5
+    def __init__(self, tolerance, discount_factor, criteria=(), policy_patience=5, time_budget=None):
+        unknown = set(criteria) - set(self.CRITERIA)
+        if unknown:
+            raise ValueError(f"Unknown stopping criteria {sorted(unknown)}, expected any of {self.CRITERIA}")
+        if "time" in criteria and time_budget is None:
+            raise ValueError("The 'time' criterion needs a time_budget in seconds")
+        self.tolerance = tolerance
+        self.discount_factor = discount_factor
+        self.criteria = tuple(criteria)
+        self.policy_patience = policy_patience
+        self.time_budget = time_budget
+        self.start()
+    @property
+    def needs_policy(self):
+        return "policy" in self.criteria
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.sweeps = 0
+        self.fired = None
+        self.sweeps_saved = 0
+        self.previous_policy = None
+        self.stable_sweeps = 0
+        self.delta = None
+        self.recent_deltas = []
+        self.wall_time = None
+        self.backups = 0
+    def check(self, diff, policy=None, where=None):
+        """
+        Records one sweep given the change in the value table (new - old) and,
+        when the "policy" rule is selected, the greedy policy after the sweep.
+        `where` masks the states that can change; terminal cells always
+        change by 0 and would pin the span to at least the max-norm change.
+        Returns True once any selected rule fires.
+        """
+        where = True if where is None else where
+        return self.check_extremes(np.min(diff, where=where, initial=np.inf),
+                                   np.max(diff, where=where, initial=-np.inf), policy)
+    def check_extremes(self, lowest, highest, policy=None):
+        """
+        Same as check, given only the smallest and largest change over the
+        states that can change, which is all the rules need. Lets solvers
+        that reduce the change in blocks skip materialising it. Solvers start
+        their extremes at inf and -inf, so lowest > highest means nothing
+        was backed up.
+        """
+        if lowest > highest:
+            lowest = highest = 0.0
+        self.sweeps += 1
+        delta = self.delta = max(abs(lowest), abs(highest))
+        self.recent_deltas = self.recent_deltas[-self.RATE_WINDOW:] + [delta]
+        if self.needs_policy:
+            if self.previous_policy is not None and np.array_equal(policy, self.previous_policy):
+                self.stable_sweeps += 1
+            else:
+                self.stable_sweeps = 0
+            self.previous_policy = policy
+        if delta < self.tolerance:
+            self.fired = "max_norm"
+        elif "span" in self.criteria and self.span_bound(highest - lowest) < self.tolerance:
+            self.fired = "span"
+        elif self.needs_policy and self.stable_sweeps >= self.policy_patience:
+            self.fired = "policy"
+        elif "time" in self.criteria and time.perf_counter() - self.start_time >= self.time_budget:
+            self.fired = "time"
+        if self.fired is not None and self.fired != "max_norm":
+            self.sweeps_saved = self.remaining_sweeps(delta)
+        return self.fired is not None
+    def span_bound(self, spread):
+        # Span semi-norm bound: (max - min) * gamma / (1 - gamma)
+        return spread * self.discount_factor / (1 - self.discount_factor)
+    def remaining_sweeps(self, delta):
+        """
+        Sweeps until the change would drop below the tolerance, extrapolating
+        the average contraction per sweep over the last RATE_WINDOW sweeps.
+        The max-norm change contracts by at least gamma per sweep, so gamma
+        is used when that is faster or there is no usable history.
+        """
+        if delta < self.tolerance:
+            return 0
+        rate = self.discount_factor
+        deltas = self.recent_deltas
+        if len(deltas) > 1 and 0 < deltas[-1] < deltas[0]:
+            rate = min(rate, (deltas[-1] / deltas[0]) ** (1 / (len(deltas) - 1)))
+        if rate <= 0:
+            return 0
+        if rate >= 1:
+            return math.inf
+        return math.ceil(math.log(self.tolerance / delta) / math.log(rate))
+    def finish(self, backups):
+        # Called by the solver once its loop ends
+        self.wall_time = time.perf_counter() - self.start_time
+        self.backups = backups
+    def report(self):
+        return {
+            "stopped_by": self.fired,
+            "sweeps": self.sweeps,
+            "sweeps_saved": self.sweeps_saved,
+            "final_delta": None if self.delta is None else float(self.delta),
+            "wall_time": self.wall_time,
+            "backups": self.backups,
+            "backups_per_sec": self.backups / self.wall_time if self.wall_time else None,
+        }
+    def summary(self):
+        if self.fired is None:
+            line = f"Reached the iteration limit after {self.sweeps} sweeps"
+        elif self.fired == "cache":
+            line = "Loaded from the value table cache (0 sweeps)"
+        else:
+            line = f"Stopped by '{self.fired}' after {self.sweeps} sweeps (~{self.sweeps_saved} sweeps saved vs. max-norm)"
+        if self.wall_time:
+            line += f"; {self.backups} backups in {self.wall_time:.4f}s ({self.backups / self.wall_time:.0f} backups/sec)"
+        return line
@@ -0,0 +1,92 @@
+import argparse
+import itertools
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from value_iteration_pygame import CustomFrozenLake
+def load_map(map_file):
+    # One map row per line, e.g. "SFFH"; blank lines are ignored
+    with open(map_file) as f:
+        return [line.strip() for line in f if line.strip()]
+def solve_map(map_file, is_slippery, settings):
+    """
+    Worker entry point: compiles the transition model for one map once and
+    solves it for every (job_index, gamma, tolerance) in settings.
+    """
+    # Solving never creates a rendering env, so workers stay free of pygame/SDL
+    agent = CustomFrozenLake(load_map(map_file), is_slippery=is_slippery, sparse=True)
+    results = []
+    for job_index, gamma, tolerance in settings:
+        agent.gamma = gamma
+        agent.value_table = np.zeros(agent.n_states)
+        start = time.perf_counter()
+        stopping = agent.compute_value_iteration(tolerance=tolerance)
+        wall_time = time.perf_counter() - start
+        results.append({
+            "job_index": job_index, "map_file": map_file, "gamma": gamma, "is_slippery": is_slippery,
+            "tolerance": tolerance, "iterations": stopping.sweeps, "wall_time": wall_time,
+            "value_table": agent.value_table.copy(), "policy": agent.greedy_policy(),
+        })
+    return results
+class NpzResultStore:
+    """
+    Appends arrays to a single .npz file as results arrive, so a long sweep
+    keeps everything it finished even if it is interrupted. Per-job tables
+    are stored as "<job>_value_table" / "<job>_policy"; close() adds one
+    column array per scalar field, indexed by job.
+    """
+    fields = ("map_file", "gamma", "is_slippery", "tolerance", "iterations", "wall_time")
+    def __init__(self, path):
+        self.path = path
+        self.rows = {}
+        # Start from an empty archive
+        zipfile.ZipFile(self.path, "w").close()
+    def write_array(self, name, array):
+        with zipfile.ZipFile(self.path, "a") as archive:
+            with archive.open(f"{name}.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(array))
+    def add(self, result):
+        job_index = result["job_index"]
+        self.write_array(f"{job_index:06d}_value_table", result["value_table"])
+        self.write_array(f"{job_index:06d}_policy", result["policy"])
+        self.rows[job_index] = result
+    def close(self):
+        order = sorted(self.rows)
+        self.write_array("job_index", np.array(order))
+        for field in self.fields:
+            self.write_array(field, np.array([self.rows[job_index][field] for job_index in order]))
+def run_sweep(map_files, gammas, slippery_values, tolerances, output, max_workers=None):
+    """
+    Fans the (map file, is_slippery) x (gamma, tolerance) grid out over a
+    process pool. Each task owns one map and slipperiness so the compiled
+    transition model is reused across every gamma and tolerance. Returns the
+    list of result dicts in job order.
+    """
+    jobs = list(itertools.product(map_files, slippery_values, gammas, tolerances))
+    groups = {}
+    for job_index, (map_file, is_slippery, gamma, tolerance) in enumerate(jobs):
+        groups.setdefault((map_file, is_slippery), []).append((job_index, gamma, tolerance))
+    store = NpzResultStore(output)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(solve_map, map_file, is_slippery, settings)
+                   for (map_file, is_slippery), settings in groups.items()]
+        for future in as_completed(futures):
+            for result in future.result():
+                store.add(result)
+                print(f"[{len(store.rows)}/{len(jobs)}] {result['map_file']} gamma={result['gamma']} "
+                      f"slippery={result['is_slippery']} tol={result['tolerance']}: "
+                      f"{result['iterations']} sweeps in {result['wall_time']:.3f}s")
+    store.close()
+    return [store.rows[job_index] for job_index in sorted(store.rows)]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a grid of FrozenLake maps and hyperparameters in parallel.")
+    parser.add_argument("map_files", nargs="+", help="text files with one map row per line")
+    parser.add_argument("--gammas", nargs="+", type=float, default=[0.9])
+    parser.add_argument("--slippery", choices=["no", "yes", "both"], default="no")
+    parser.add_argument("--tolerances", nargs="+", type=float, default=[1e-8])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="sweep_results.npz")
+    args = parser.parse_args()
+    slippery_values = {"no": [False], "yes": [True], "both": [False, True]}[args.slippery]
+    run_sweep(args.map_files, args.gammas, slippery_values, args.tolerances, args.output, args.workers)
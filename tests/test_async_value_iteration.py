@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from async_value_iteration import AsynchronousValueIteration, PrioritizedSweepingValueIteration
+from benchmark import grid_arguments, random_map
+def test_prioritized_sweeping_matches_async():
+    arguments = grid_arguments(random_map(16))
+    agent = AsynchronousValueIteration(**arguments)
+    agent.run_value_iteration(max_iterations=10 ** 4, delta_threshold=1e-10)
+    prioritized = PrioritizedSweepingValueIteration(**arguments)
+    assert prioritized.run_value_iteration(max_iterations=10 ** 4, delta_threshold=1e-10).fired == "max_norm"
+    np.testing.assert_allclose(prioritized.value_table, agent.value_table, atol=1e-8)
+def test_prioritized_sweeping_time_budget():
+    agent = PrioritizedSweepingValueIteration(discount_factor=0.999, **grid_arguments(random_map(32)))
+    stopping = agent.run_value_iteration(max_iterations=10 ** 6, delta_threshold=1e-12, stopping=("time",), time_budget=0)
+    assert stopping.fired == "time"
+    assert stopping.sweeps == 1
+@pytest.mark.parametrize("stopping", [("span",), ("policy",)])
+def test_prioritized_sweeping_rejects_sweep_rules(stopping):
+    with pytest.raises(ValueError):
+        PrioritizedSweepingValueIteration().run_value_iteration(stopping=stopping)
+@pytest.mark.parametrize("option", [{"ordering": "red_black"}, {"backend": "numba"}])
+def test_prioritized_sweeping_rejects_ordering_and_backend(option):
+    with pytest.raises(ValueError):
+        PrioritizedSweepingValueIteration(**option)
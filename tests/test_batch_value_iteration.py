@@ -0,0 +1,21 @@
+import numpy as np
+from gymnasium.envs.toy_text.frozen_lake import generate_random_map
+from batch_value_iteration import BatchFrozenLake
+from value_iteration_pygame import MY_MAP, CustomFrozenLake
+def test_identical_maps_converging_together():
+    batch = BatchFrozenLake([MY_MAP, MY_MAP])
+    iterations = batch.compute_value_iteration()
+    agent = CustomFrozenLake(MY_MAP, sparse=True)
+    agent.compute_value_iteration()
+    assert iterations[0] == iterations[1]
+    for value_table in batch.results()[0]:
+        np.testing.assert_allclose(value_table, agent.value_table, atol=1e-12)
+def test_many_random_maps_match_single_solves():
+    maps = [generate_random_map(size=8, seed=seed) for seed in range(200)]
+    batch = BatchFrozenLake(maps, is_slippery=True)
+    batch.compute_value_iteration()
+    value_tables, _ = batch.results()
+    for layout, value_table in zip(maps[:10], value_tables):
+        agent = CustomFrozenLake(layout, is_slippery=True, sparse=True)
+        agent.compute_value_iteration()
+        np.testing.assert_allclose(value_table, agent.value_table, atol=1e-12)
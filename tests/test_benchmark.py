@@ -0,0 +1,9 @@
+import pytest
+from gymnasium.envs.toy_text.frozen_lake import is_valid
+from benchmark import random_map
+@pytest.mark.parametrize("size", [2, 8, 33])
+@pytest.mark.parametrize("seed", range(5))
+def test_random_map_goal_is_reachable(size, seed):
+    map_layout = random_map(size, hole_fraction=0.5, seed=seed)
+    assert map_layout[0][0] == "S" and map_layout[-1][-1] == "G"
+    assert is_valid([list(row) for row in map_layout], size)
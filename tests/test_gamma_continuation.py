@@ -0,0 +1,13 @@
+import pytest
+from gymnasium.envs.toy_text.frozen_lake import generate_random_map
+from gamma_continuation import WARM_STARTS, print_report, solve_gamma_schedule
+@pytest.mark.parametrize("warm_start", WARM_STARTS)
+@pytest.mark.parametrize("is_slippery", [False, True])
+def test_warm_starts_reach_the_cold_tables(warm_start, is_slippery, capsys):
+    results = solve_gamma_schedule(generate_random_map(size=8, seed=0), [0.5, 0.9, 0.99], is_slippery,
+                                   warm_start=warm_start, sparse=True)
+    for result in results:
+        assert result["max_difference"] < 1e-6
+        assert result["seed_time"] >= 0
+    print_report(results)
+    assert "cold" in capsys.readouterr().out.splitlines()[-1]
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from gymnasium.envs.toy_text.frozen_lake import generate_random_map
+from async_value_iteration import AsynchronousValueIteration
+from benchmark import grid_arguments
+from value_iteration_pygame import CustomFrozenLake
+pytest.importorskip("numba")
+MAPS = [generate_random_map(size=size, seed=seed) for size in (4, 8, 16) for seed in range(3)]
+@pytest.mark.parametrize("map_layout", MAPS)
+def test_async_sweep_matches_numpy(map_layout):
+    tables = []
+    for backend in ("numpy", "numba"):
+        agent = AsynchronousValueIteration(discount_factor=0.95, backend=backend, **grid_arguments(map_layout))
+        stopping = agent.run_value_iteration(max_iterations=10 ** 4, delta_threshold=1e-10)
+        tables.append((stopping.sweeps, agent.value_table))
+    assert tables[0][0] == tables[1][0]
+    np.testing.assert_allclose(tables[1][1], tables[0][1], atol=1e-12)
+@pytest.mark.parametrize("map_layout", MAPS)
+@pytest.mark.parametrize("is_slippery", [False, True])
+def test_csr_sync_sweep_matches_numpy(map_layout, is_slippery):
+    tables = []
+    for backend in ("numpy", "numba"):
+        agent = CustomFrozenLake(map_layout, is_slippery=is_slippery, sparse=True, backend=backend)
+        stopping = agent.compute_value_iteration(tolerance=1e-10)
+        tables.append((stopping.sweeps, agent.value_table))
+    assert tables[0][0] == tables[1][0]
+    np.testing.assert_allclose(tables[1][1], tables[0][1], atol=1e-12)
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from gymnasium.envs.toy_text.frozen_lake import generate_random_map
+from out_of_core import OutOfCoreFrozenLake
+from value_iteration_pygame import CustomFrozenLake
+MAP = generate_random_map(size=16, seed=0)
+@pytest.mark.parametrize("is_slippery", [False, True])
+def test_matches_in_memory_solve(tmp_path, is_slippery):
+    agent = OutOfCoreFrozenLake(MAP, is_slippery=is_slippery, directory=str(tmp_path), block_rows=3)
+    assert isinstance(agent.value_table, np.memmap)
+    agent.compute_value_iteration()
+    reference = CustomFrozenLake(MAP, is_slippery=is_slippery, sparse=True)
+    reference.compute_value_iteration()
+    np.testing.assert_allclose(agent.value_table, reference.value_table, atol=1e-12)
+def test_upcast_stays_memory_mapped(tmp_path):
+    agent = OutOfCoreFrozenLake(MAP, directory=str(tmp_path), block_rows=3, dtype=np.float32)
+    with pytest.warns(UserWarning, match="switching to float64"):
+        agent.ensure_precision(1e-10)
+    assert isinstance(agent.value_table, np.memmap)
+    assert agent.value_table.dtype == np.float64 and agent.probs.dtype == np.float64
+def test_update_tiles_is_rejected(tmp_path):
+    agent = OutOfCoreFrozenLake(MAP, directory=str(tmp_path))
+    agent.compute_value_iteration()
+    with pytest.raises(ValueError, match="update_tiles"):
+        agent.update_tiles({(0, 1): "H"})
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from gymnasium.envs.toy_text.frozen_lake import generate_random_map
+from parallel_value_iteration import ParallelValueIteration
+from value_iteration_pygame import CustomFrozenLake
+MAP = generate_random_map(size=16, seed=0)
+@pytest.mark.parametrize("n_workers", [1, 3])
+@pytest.mark.parametrize("is_slippery", [False, True])
+def test_matches_single_threaded_solve(n_workers, is_slippery):
+    reference = CustomFrozenLake(MAP, is_slippery=is_slippery, sparse=True)
+    expected = reference.compute_value_iteration()
+    agent = CustomFrozenLake(MAP, is_slippery=is_slippery, sparse=True)
+    stopping = ParallelValueIteration(agent, n_workers=n_workers).compute_value_iteration()
+    assert stopping.sweeps == expected.sweeps
+    np.testing.assert_allclose(agent.value_table, reference.value_table, atol=1e-12)
+def test_policy_rule_matches_single_threaded_solve():
+    reference = CustomFrozenLake(MAP, is_slippery=True, sparse=True)
+    expected = reference.compute_value_iteration(stopping=("policy",))
+    agent = CustomFrozenLake(MAP, is_slippery=True, sparse=True)
+    stopping = ParallelValueIteration(agent, n_workers=3).compute_value_iteration(stopping=("policy",))
+    assert stopping.fired == expected.fired == "policy" and stopping.sweeps == expected.sweeps
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+from async_value_iteration import AsynchronousValueIteration
+from benchmark import grid_arguments, random_map
+from shared_value_iteration import SharedMemoryValueIteration
+def test_matches_async_value_iteration():
+    arguments = dict(discount_factor=0.9, **grid_arguments(random_map(12)))
+    tolerance = 1e-8
+    reference = AsynchronousValueIteration(**arguments)
+    reference.run_value_iteration(max_iterations=10 ** 4, delta_threshold=tolerance)
+    agent = SharedMemoryValueIteration(n_workers=2, **arguments)
+    stopping = agent.run_value_iteration(max_iterations=10 ** 4, delta_threshold=tolerance)
+    assert stopping.fired == "max_norm"
+    # Each run is within tolerance * gamma / (1 - gamma) of the fixed point
+    np.testing.assert_allclose(agent.value_table, reference.value_table, atol=2 * tolerance * 0.9 / 0.1)
+@pytest.mark.parametrize("option", [{"ordering": "red_black"}, {"backend": "numba"}])
+def test_rejects_ordering_and_backend(option):
+    with pytest.raises(ValueError):
+        SharedMemoryValueIteration(n_workers=2, **option)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from gymnasium.envs.toy_text.frozen_lake import generate_random_map
+from async_value_iteration import AsynchronousValueIteration
+from stopping_criteria import StoppingCriteria
+from value_iteration import ValueIteration
+from value_iteration_pygame import CustomFrozenLake
+# No terminal cells: every sweep shifts the whole table by the same step
+# cost, which the span rule recognises after one sweep
+OPEN_GRID = dict(discount_factor=0.999, shape=(4, 4), goal_pos=[], pit_pos=[], wall_pos=[])
+SLIPPERY_MAP = generate_random_map(size=8, seed=0)
+def test_check_ignores_masked_states():
+    stopping = StoppingCriteria(1e-6, 0.999, ("span",))
+    diff = np.array([0.0, -0.5, -0.5, 0.0])
+    assert stopping.check(diff, where=np.array([False, True, True, False]))
+    assert stopping.fired == "span" and stopping.delta == 0.5
+def test_empty_mask_counts_as_no_change():
+    stopping = StoppingCriteria(1e-6, 0.9)
+    assert stopping.check(np.zeros(3), where=np.zeros(3, dtype=bool))
+    assert stopping.fired == "max_norm"
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_span_fires_for_value_iteration(vectorized):
+    agent = ValueIteration(vectorized=vectorized, **OPEN_GRID)
+    stopping = agent.run_value_iteration(iterations=10 ** 5, delta_e=1e-6, stopping=("span",))
+    assert stopping.fired == "span" and stopping.sweeps == 1
+# Under red_black the two colours' changes differ by a factor gamma every sweep
+@pytest.mark.parametrize("ordering", ["row_major", "goal_outward"])
+def test_span_fires_for_async_value_iteration(ordering):
+    agent = AsynchronousValueIteration(ordering=ordering, **OPEN_GRID)
+    stopping = agent.run_value_iteration(max_iterations=10 ** 5, delta_threshold=1e-6, stopping=("span",))
+    assert stopping.fired == "span" and stopping.sweeps == 1
+def test_sweeps_saved_tracks_the_observed_contraction():
+    full = CustomFrozenLake(SLIPPERY_MAP, is_slippery=True, sparse=True)
+    full.gamma = 0.99
+    sweeps = full.compute_value_iteration().sweeps
+    early = CustomFrozenLake(SLIPPERY_MAP, is_slippery=True, sparse=True)
+    early.gamma = 0.99
+    stopping = early.compute_value_iteration(stopping=("policy",))
+    saved = sweeps - stopping.sweeps
+    assert stopping.fired == "policy" and saved / 2 <= stopping.sweeps_saved <= saved * 2
+def test_sweeps_saved_falls_back_to_the_gamma_bound():
+    stopping = StoppingCriteria(1e-8, 0.9)
+    stopping.recent_deltas = [1.0]
+    assert stopping.remaining_sweeps(1.0) == 175
@@ -0,0 +1,14 @@
+import numpy as np
+import pytest
+from gymnasium.envs.toy_text.frozen_lake import generate_random_map
+from value_iteration_pygame import MY_MAP, build_transition_model, matches_gymnasium
+RANDOM_MAPS = [generate_random_map(size=size, seed=seed) for size in (2, 4, 8, 16) for seed in range(5)]
+RECTANGULAR_MAP = ["SFFHF", "FHFFF", "FFFHG"]
+@pytest.mark.parametrize("is_slippery", [False, True])
+@pytest.mark.parametrize("map_layout", RANDOM_MAPS + [MY_MAP, RECTANGULAR_MAP])
+def test_matches_gymnasium(map_layout, is_slippery):
+    assert matches_gymnasium(map_layout, is_slippery)
+@pytest.mark.parametrize("is_slippery", [False, True])
+def test_probabilities_sum_to_one(is_slippery):
+    _, probs, _, _ = build_transition_model(RECTANGULAR_MAP, is_slippery)
+    np.testing.assert_allclose(probs.sum(axis=2), 1.0)
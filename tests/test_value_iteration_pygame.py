@@ -0,0 +1,82 @@
+import tracemalloc
+import warnings
+import numpy as np
+import pytest
+from gymnasium.envs.toy_text.frozen_lake import generate_random_map
+from value_iteration_pygame import MY_MAP, CustomFrozenLake
+def test_float32_switches_to_float64_for_tight_tolerance():
+    agent = CustomFrozenLake(MY_MAP, dtype=np.float32)
+    with pytest.warns(UserWarning, match="switching to float64"):
+        agent.ensure_precision(1e-10)
+    assert agent.dtype == np.float64 and agent.value_table.dtype == np.float64
+def test_float64_is_left_alone_for_tight_tolerance():
+    agent = CustomFrozenLake(MY_MAP)
+    T = agent.T
+    with pytest.warns(UserWarning, match="may never be met"):
+        agent.ensure_precision(1e-16)
+    assert agent.dtype == np.float64 and agent.T is T
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        agent.ensure_precision(1e-8)
+def test_update_tiles_matches_fresh_solve():
+    agent = CustomFrozenLake(MY_MAP, is_slippery=True, sparse=True)
+    agent.compute_value_iteration(tolerance=1e-10)
+    agent.update_tiles({(1, 1): "H", (0, 3): "F"}, tolerance=1e-10)
+    reference = CustomFrozenLake(agent.map_layout, is_slippery=True, sparse=True)
+    reference.compute_value_iteration(tolerance=1e-10)
+    np.testing.assert_allclose(agent.value_table, reference.value_table, atol=1e-8)
+@pytest.mark.parametrize("tiles", [{(0, 1): "H", (9, 9): "F"}, {(0, 1): "H", (0, 2): "X"}])
+def test_update_tiles_rejects_bad_edits_before_editing(tiles):
+    agent = CustomFrozenLake(MY_MAP, sparse=True)
+    agent.compute_value_iteration()
+    layout, value_table = list(agent.map_layout), agent.value_table.copy()
+    with pytest.raises(ValueError):
+        agent.update_tiles(tiles)
+    assert agent.map_layout == layout
+    np.testing.assert_array_equal(agent.value_table, value_table)
+def test_cache_path_ignores_numpy_scalar_types(tmp_path):
+    agent = CustomFrozenLake(MY_MAP, cache_dir=str(tmp_path))
+    path = agent.cache_path(1e-8)
+    agent.gamma = np.float64(0.9)
+    assert agent.cache_path(np.float64(1e-8)) == path
+def test_sparse_sweeps_do_not_allocate():
+    agent = CustomFrozenLake(generate_random_map(size=64, seed=0), is_slippery=True, sparse=True)
+    transients = []
+    def record_transient(iteration, delta, table_view):
+        # Memory allocated and released again during the sweep
+        current, peak = tracemalloc.get_traced_memory()
+        transients.append(peak - current)
+        tracemalloc.reset_peak()
+    tracemalloc.start()
+    try:
+        agent.compute_value_iteration(on_sweep=record_transient)
+    finally:
+        tracemalloc.stop()
+    gather_bytes = agent.next_states.size * agent.dtype.itemsize
+    assert max(transients[1:]) < gather_bytes / 10
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_policy_iteration_matches_value_iteration(dtype):
+    layout = generate_random_map(size=8, seed=0)
+    reference = CustomFrozenLake(layout, is_slippery=True, sparse=True)
+    reference.compute_value_iteration(tolerance=1e-10)
+    agent = CustomFrozenLake(layout, is_slippery=True, sparse=True, dtype=dtype)
+    assert agent.compute_policy_iteration().fired == "policy"
+    assert agent.value_table.dtype == dtype
+    np.testing.assert_allclose(agent.value_table, reference.value_table, atol=1e-6 if dtype == np.float32 else 1e-8)
+    # Compared by value, since some states have equally good actions
+    np.testing.assert_allclose(reference.evaluate_policy(agent.policy), reference.value_table, atol=1e-8)
+@pytest.mark.parametrize("evaluation_sweeps", [0, 5])
+def test_modified_policy_iteration_matches_value_iteration(evaluation_sweeps):
+    layout = generate_random_map(size=8, seed=0)
+    reference = CustomFrozenLake(layout, is_slippery=True, sparse=True)
+    expected = reference.compute_value_iteration(tolerance=1e-10)
+    agent = CustomFrozenLake(layout, is_slippery=True, sparse=True)
+    stopping = agent.compute_modified_policy_iteration(evaluation_sweeps, tolerance=1e-10)
+    assert stopping.fired == "max_norm"
+    if evaluation_sweeps == 0:
+        assert stopping.sweeps == expected.sweeps
+    else:
+        assert stopping.sweeps < expected.sweeps
+    np.testing.assert_allclose(agent.value_table, reference.value_table, atol=1e-8)
+    # Compared by value, since some states have equally good actions
+    np.testing.assert_allclose(reference.evaluate_policy(agent.policy), reference.value_table, atol=1e-8)
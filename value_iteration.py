@@ -1,27 +1,48 @@
 import numpy as np
+from grid_world import GridWorld
+from stopping_criteria import StoppingCriteria
 class ValueIteration:
-    def __init__(self, immediate_reward=-0.04,discount_factor=0.9, goal_pos=(0, 2), pit_pos=(1, 2),wall_pos=(1, 1)):
+    # goal_pos, pit_pos and wall_pos each take one (row, col), a collection of them or a boolean mask
+    def __init__(self, immediate_reward=-0.04,discount_factor=0.9, goal_pos=(0, 2), pit_pos=(1, 2),wall_pos=(1, 1), vectorized=False, shape=(3, 3), verbose=0):
         self.immediate_reward = immediate_reward
         self.discount_factor = discount_factor
-        self.value_table=np.zeros((3,3))
-        self.value_table[goal_pos]=1
-        self.value_table[pit_pos]=-1
-        self.value_table[wall_pos]=0
+        self.vectorized = vectorized
+        # 0: silent, 1: start line and run summary, 2: also the table after every sweep
+        self.verbose = verbose
+        self.grid = GridWorld(shape, goal_pos, pit_pos, wall_pos)
+        self.value_table = self.grid.initial_value_table()
+        self.backups = 0
+        # Second table of the ping-pong pair and scratch arrays, allocated
+        # once per run so sweeps write into existing memory
+        self.next_table = None
     def print_value_table(self):
         print(self.value_table)
     def bellman_equation(self, immediate_reward, next_state_value, prob):
         return prob * (immediate_reward + self.discount_factor * next_state_value)
+    def allocate_buffers(self):
+        # Fixed cells never change, so copying once keeps them right in both tables
+        self.next_table = self.value_table.copy()
+        self.diff = np.empty_like(self.value_table)
+        self.padded = np.empty((self.grid.shape[0] + 2, self.grid.shape[1] + 2))
+        self.best_neighbour = np.empty_like(self.value_table)
+        self.updatable = ~self.grid.fixed
+    def swap_tables(self):
+        # The new values become current; the old ones are overwritten next sweep
+        self.value_table, self.next_table = self.next_table, self.value_table
     def update_value_table_single_step(self):
-        new_value_table = np.copy(self.value_table)
+        if self.next_table is None or self.next_table.shape != self.value_table.shape:
+            self.allocate_buffers()
+        new_value_table = self.next_table
         actions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # up, down, left, right
-        for i in range(3):
-            for j in range(3):
-                if (i, j) in [(0, 2), (1, 2), (1, 1)]:  # goal, pit, wall positions
+        rows, cols = self.grid.shape
+        for i in range(rows):
+            for j in range(cols):
+                if self.grid.fixed[i, j]:  # goal, pit or wall
                     continue
                 max_value = float('-inf')
                 for action in actions:
                     next_state=(i + action[0], j + action[1])
-                    if next_state[0] < 0 or next_state[0] >= 3 or next_state[1] < 0 or next_state[1] >= 3:
+                    if next_state[0] < 0 or next_state[0] >= rows or next_state[1] < 0 or next_state[1] >= cols:
                         next_state = (i, j)  # stay in place if out of bounds
                         next_state_value = self.value_table[next_state]
                     else:
@@ -30,16 +51,83 @@ class ValueIteration:
                     if expected_value > max_value:
                         max_value = expected_value
                 new_value_table[i, j] = max_value
-        self.value_table = new_value_table
-        print(f"Updated Value Table: ")
-        self.print_value_table()
-        print("--------------------------------------------------")
-    def run_value_iteration(self, iterations=100, delta_e=0.0001):
-        for _ in range(iterations):
-            old_value_table = np.copy(self.value_table)
-            self.update_value_table_single_step()
-            if np.max(np.abs(self.value_table - old_value_table)) < delta_e:
+        self.swap_tables()
+        if self.verbose >= 2:
+            print(f"Updated Value Table: ")
+            self.print_value_table()
+            print("--------------------------------------------------")
+    def action_values(self):
+        """
+        Backed-up value of each action in every cell, shape (4, rows, cols),
+        built from shifted neighbour views of the value table.
+        """
+        # Edge padding reproduces the stay-in-place rule at the boundary
+        padded = np.pad(self.value_table, 1, mode="edge")
+        neighbours = np.stack([
+            padded[:-2, 1:-1],  # up
+            padded[2:, 1:-1],   # down
+            padded[1:-1, :-2],  # left
+            padded[1:-1, 2:],   # right
+        ])
+        return self.bellman_equation(self.immediate_reward, neighbours, 1.0)
+    def greedy_policy(self):
+        return np.argmax(self.action_values(), axis=0)
+    def update_value_table_vectorized(self):
+        """
+        Same backup as update_value_table_single_step, done as whole-array
+        operations on shifted neighbour views of the value table.
+        """
+        if self.next_table is None or self.next_table.shape != self.value_table.shape:
+            self.allocate_buffers()
+        # Edge padding into a preallocated frame reproduces the stay-in-place
+        # rule; the Bellman backup is increasing in the neighbour's value, so
+        # backing up the best neighbour gives the same result as action_values
+        padded, best = self.padded, self.best_neighbour
+        padded[1:-1, 1:-1] = self.value_table
+        padded[0, 1:-1], padded[-1, 1:-1] = self.value_table[0], self.value_table[-1]
+        padded[1:-1, 0], padded[1:-1, -1] = self.value_table[:, 0], self.value_table[:, -1]
+        np.maximum(padded[:-2, 1:-1], padded[2:, 1:-1], out=best)
+        np.maximum(best, padded[1:-1, :-2], out=best)
+        np.maximum(best, padded[1:-1, 2:], out=best)
+        best *= self.discount_factor
+        best += self.immediate_reward
+        np.copyto(self.next_table, best, where=self.updatable)
+        self.swap_tables()
+        if self.verbose >= 2:
+            print(f"Updated Value Table: ")
+            self.print_value_table()
+            print("--------------------------------------------------")
+    def run_value_iteration(self, iterations=100, delta_e=0.0001, stopping=(), policy_patience=5, time_budget=None, on_sweep=None):
+        """
+        on_sweep, if given, is called as on_sweep(iteration, delta, table_view)
+        after every sweep with a read-only view of the value table. The two
+        tables are reused in turn, so copy the view to keep it past the next
+        sweep.
+        """
+        step = self.update_value_table_vectorized if self.vectorized else self.update_value_table_single_step
+        if self.verbose >= 1:
+            print(f"Starting Value Iteration on a {self.grid.shape[0]}x{self.grid.shape[1]} grid...")
+        self.stopping = StoppingCriteria(delta_e, self.discount_factor, stopping, policy_patience, time_budget)
+        self.backups = 0
+        updatable = int(np.count_nonzero(~self.grid.fixed))
+        self.allocate_buffers()
+        for iteration in range(1, iterations + 1):
+            step()
+            self.backups += updatable
+            policy = self.greedy_policy() if self.stopping.needs_policy else None
+            # After the swap next_table holds the previous sweep's values
+            done = self.stopping.check(np.subtract(self.value_table, self.next_table, out=self.diff), policy,
+                                       where=self.updatable)
+            if on_sweep is not None:
+                table_view = self.value_table.view()
+                table_view.flags.writeable = False
+                on_sweep(iteration, self.stopping.delta, table_view)
+            if done:
                 break
+        self.stopping.finish(self.backups)
+        if self.verbose >= 1:
+            print(self.stopping.summary())
+        return self.stopping
 if __name__ == "__main__":
-    vi = ValueIteration()
+    vi = ValueIteration(verbose=2)
     vi.run_value_iteration()
@@ -1,6 +1,18 @@
-import gymnasium as gym
+import glob
+import hashlib
+import heapq
+import json
+import os
 import numpy as np
 import time
+import warnings
+from numba_kernels import NUMBA_AVAILABLE, compiled, csr_sync_sweep, successors_to_csr
+from stopping_criteria import StoppingCriteria
+try:
+    from scipy.sparse import csr_matrix, identity
+    from scipy.sparse.linalg import spsolve
+except ImportError:  # exact policy evaluation falls back to a dense solve
+    csr_matrix = None
 # 1. DEFINE YOUR CUSTOM MAP HERE
 # You can make this 3x3, 4x4, 8x8, etc.
 # Just ensure it's a square or rectangle.
@@ -10,43 +22,538 @@ MY_MAP = [
     "HFHF",
     "FFFF"
 ]
+# Bump whenever a change to the solver would change the tables it produces,
+# so stale cache entries are no longer picked up
+SOLVER_VERSION = 1
+def compile_successor_arrays(P, n_states, n_actions, n_successors=None):
+    """
+    Turns a gymnasium P dict into successor indices and probabilities of
+    shape (S, A, n_successors) plus expected rewards R[s, a]. FrozenLake has
+    at most 3 successors per (s, a); unused slots point back at s with
+    probability 0.
+    """
+    if n_successors is None:
+        n_successors = max(len(P[s][a]) for s in range(n_states) for a in range(n_actions))
+    next_states = np.tile(np.arange(n_states)[:, None, None], (1, n_actions, n_successors))
+    probs = np.zeros((n_states, n_actions, n_successors))
+    rewards = np.zeros((n_states, n_actions))
+    for s in range(n_states):
+        for a in range(n_actions):
+            for k, (prob, next_s, reward, _) in enumerate(P[s][a]):
+                next_states[s, a, k] = next_s
+                probs[s, a, k] = prob
+                rewards[s, a] += prob * reward
+    return next_states, probs, rewards
+# Row/column offsets of gymnasium's FrozenLake actions: LEFT, DOWN, RIGHT, UP
+ACTION_MOVES = np.array([(0, -1), (1, 0), (0, 1), (-1, 0)])
+def build_transition_model(map_layout, is_slippery=False):
+    """
+    Builds the same dynamics as gymnasium's FrozenLake-v1 straight from a
+    MY_MAP-style list of strings, without creating an environment. Returns
+    successor indices and probabilities of shape (S, A, K) (K = 3 when
+    slippery, 1 otherwise), expected rewards R[s, a] and the terminal mask.
+    Slots are laid out like env.unwrapped.P, so compile_successor_arrays on
+    the gym env gives identical arrays.
+    """
+    desc = np.asarray(map_layout, dtype="c")
+    n_rows, n_cols = desc.shape
+    n_states = n_rows * n_cols
+    rows, cols = np.divmod(np.arange(n_states), n_cols)
+    # Moving off the grid leaves the agent where it is
+    moved_rows = np.clip(rows[:, None] + ACTION_MOVES[:, 0], 0, n_rows - 1)
+    moved_cols = np.clip(cols[:, None] + ACTION_MOVES[:, 1], 0, n_cols - 1)
+    moved = moved_rows * n_cols + moved_cols
+    # A slippery move goes to the intended direction or one of its two
+    # perpendicular neighbours, each with probability ~1/3 (computed the way
+    # gymnasium does, so the probabilities match bit for bit)
+    actions = np.arange(4)[:, None]
+    if is_slippery:
+        directions = np.hstack([(actions - 1) % 4, actions, (actions + 1) % 4])
+        success_rate = 1.0 / 3.0
+        fail_rate = (1.0 - success_rate) / 2.0
+        slot_probs = np.array([fail_rate, success_rate, fail_rate])
+    else:
+        directions = actions
+        slot_probs = np.array([1.0])
+    # Contiguous, or every np.take over it would first copy the indices
+    next_states = np.ascontiguousarray(moved[:, directions])
+    probs = np.broadcast_to(slot_probs, next_states.shape).copy()
+    letters = desc.ravel()
+    terminal = np.isin(letters, [b"G", b"H"])
+    # Holes and the goal are absorbing: one self-loop with probability 1
+    next_states[terminal] = np.arange(n_states)[terminal, None, None]
+    probs[terminal] = 0.0
+    probs[terminal, :, 0] = 1.0
+    rewards = np.sum(probs * (letters[next_states] == b"G"), axis=2)
+    rewards[terminal] = 0.0
+    return next_states, probs, rewards, terminal
+def matches_gymnasium(map_layout, is_slippery=False):
+    """
+    Conformance check: True if build_transition_model agrees exactly with
+    the P dict of gymnasium's FrozenLake-v1 for this map.
+    """
+    import gymnasium as gym
+    env = gym.make("FrozenLake-v1", desc=map_layout, is_slippery=is_slippery)
+    next_states, probs, rewards, terminal = build_transition_model(map_layout, is_slippery)
+    n_states, n_actions, n_successors = next_states.shape
+    expected = compile_successor_arrays(env.unwrapped.P, n_states, n_actions, n_successors)
+    env.close()
+    return (np.array_equal(next_states, expected[0]) and np.array_equal(probs, expected[1])
+            and np.array_equal(rewards, expected[2])
+            and np.array_equal(terminal, np.isin(env.unwrapped.desc.ravel(), [b"G", b"H"])))
+def greedy_actions(q_values):
+    # Lowest-index action within rounding noise of the best, so that
+    # symmetric slippery moves do not flip the policy from sweep to sweep
+    slack = max(1e-12, 4 * np.finfo(q_values.dtype).eps)
+    return np.argmax(q_values >= q_values.max(axis=-1, keepdims=True) - slack, axis=-1)
 class CustomFrozenLake:
-    def __init__(self, map_layout, is_slippery=False):
-        self.env = gym.make("FrozenLake-v1", desc=map_layout, is_slippery=is_slippery, render_mode="human")
-        self.n_states = self.env.observation_space.n
-        self.n_actions = self.env.action_space.n
+    def __init__(self, map_layout, is_slippery=False, sparse=False, cache_dir=None, backend="numpy", dtype=np.float64):
+        if backend not in ("numpy", "numba"):
+            raise ValueError(f"Unknown backend {backend!r}, expected 'numpy' or 'numba'")
+        if np.dtype(dtype) not in (np.float32, np.float64):
+            raise ValueError(f"Unknown dtype {dtype!r}, expected float32 or float64")
+        if backend == "numba" and not NUMBA_AVAILABLE:
+            warnings.warn("numba is not installed, falling back to the NumPy backend", stacklevel=2)
+            backend = "numpy"
+        self.map_layout = [row if isinstance(row, str) else row.decode() for row in map_layout]
+        self.is_slippery = is_slippery
+        self.sparse = sparse
+        # backend="numba" runs value iteration sweeps as a parallel compiled
+        # kernel over a CSR copy of the transition model
+        self.backend = backend
+        self.cache_dir = cache_dir
+        # Precision of the value table and transition arrays; float32 halves
+        # their memory and bandwidth, see ensure_precision
+        self.dtype = np.dtype(dtype)
+        # No environment is kept around for solving; play() creates one
+        # (and only then brings up the render window) when it is called
+        self.env = None
+        self.n_states = len(self.map_layout) * len(self.map_layout[0])
+        self.n_actions = 4
         self.gamma = 0.9
-        self.value_table = np.zeros(self.n_states)
-    def compute_value_iteration(self):
-        P = self.env.unwrapped.P
+        self.value_table = self.initial_value_table()
+        self.compile_transition_model()
+    def initial_value_table(self):
+        return np.zeros(self.n_states, dtype=self.dtype)
+    def cast_value_table(self, dtype):
+        # Overridden where the table cannot be copied in memory
+        return self.value_table.astype(dtype)
+    @property
+    def value_table(self):
+        return self._value_table
+    @value_table.setter
+    def value_table(self, value_table):
+        # A new table makes the cached greedy policy stale
+        self._value_table = value_table
+        self._policy = None
+    @property
+    def policy(self):
+        """
+        Greedy action per state as an int array, computed with one vectorized
+        argmax over the Q-values and reused until value_table is reassigned.
+        """
+        if self._policy is None:
+            self._policy = self.greedy_policy()
+        return self._policy
+    def make_env(self, render_mode=None):
+        # Only play() needs an environment, so solver-only use never imports gymnasium
+        import gymnasium as gym
+        return gym.make("FrozenLake-v1", desc=self.map_layout, is_slippery=self.is_slippery, render_mode=render_mode)
+    def compile_transition_model(self):
+        """
+        Builds the transition model once, straight from the map, so sweeps
+        are plain array operations: R[s, a] expected immediate reward, a
+        terminal (hole/goal) mask and successor indices and probabilities
+        of shape (S, A, 3). Unless sparse=True, sweeps use a dense
+        T[s, a, s'] tensor built from them.
+        """
+        self.next_states, self.probs, self.R, self.terminal = build_transition_model(self.map_layout, self.is_slippery)
+        self.probs, self.R = self.probs.astype(self.dtype, copy=False), self.R.astype(self.dtype, copy=False)
+        self.start_states = np.flatnonzero(np.asarray(self.map_layout, dtype="c").ravel() == b"S")
+        if self.backend == "numba":
+            self.row_start, self.columns, self.data = successors_to_csr(self.next_states, self.probs)
+        if not self.sparse:
+            self.T = np.zeros((self.n_states, self.n_actions, self.n_states), dtype=self.dtype)
+            states = np.arange(self.n_states)[:, None, None]
+            actions = np.arange(self.n_actions)[None, :, None]
+            # Accumulate, since slippery moves into a wall share a successor
+            np.add.at(self.T, (states, actions, self.next_states), self.probs)
+    def reward_bound(self):
+        return np.abs(self.R).max(initial=0.0)
+    def ensure_precision(self, tolerance):
+        """
+        Switches float32 tables to float64 (with a warning) when the tolerance
+        is below the rounding error of float32 at the largest possible value,
+        max|R| / (1 - gamma), since such a tolerance could never be met. For
+        float64 there is nothing wider to switch to, so it only warns that
+        the max-norm rule may never fire.
+        """
+        scale = max(self.reward_bound() / (1 - self.gamma), 1.0)
+        if tolerance >= np.finfo(self.dtype).eps * scale:
+            return
+        if self.dtype == np.float32:
+            warnings.warn(f"tolerance {tolerance:g} is below float32 resolution for values up to "
+                          f"{scale:g}, switching to float64", stacklevel=3)
+            self.dtype = np.dtype(np.float64)
+            self.compile_transition_model()
+            self.value_table = self.cast_value_table(self.dtype)
+        else:
+            warnings.warn(f"tolerance {tolerance:g} is below {self.dtype.name} resolution for values up to "
+                          f"{scale:g} and may never be met; consider a time_budget", stacklevel=3)
+    def compute_q_values(self, value_table, out=None, gather=None):
+        # Q[s, a] = R[s, a] + gamma * sum_s' T[s, a, s'] * V[s']
+        # out (S, A) and, for the sparse model, gather (S, A, 3) are optional
+        # preallocated buffers, so sweeps can run without allocating
+        if self.sparse:
+            # mode="clip" writes straight into gather; the default "raise"
+            # buffers the result first. The indices are valid by construction
+            gather = np.take(value_table, self.next_states, out=gather, mode="clip")
+            gather *= self.probs
+            q_values = np.sum(gather, axis=2, out=out)
+        else:
+            q_values = np.matmul(self.T, value_table, out=out)
+        q_values *= self.gamma
+        q_values += self.R
+        return q_values
+    def greedy_policy(self):
+        return self.greedy_policy_of(self.value_table)
+    def greedy_policy_of(self, value_table):
+        return greedy_actions(self.compute_q_values(value_table))
+    def evaluate_policy(self, policy=None):
+        """
+        Exact discounted value of a policy (the greedy one by default),
+        solving (I - gamma * P_pi) V = R_pi as a sparse linear system.
+        """
+        policy = self.policy if policy is None else policy
+        states = np.arange(self.n_states)
+        rewards = self.R[states, policy]
+        next_states, probs = self.next_states[states, policy], self.probs[states, policy]
+        if csr_matrix is None:
+            transitions = np.zeros((self.n_states, self.n_states))
+            np.add.at(transitions, (states[:, None], next_states), probs)
+            return np.linalg.solve(np.eye(self.n_states) - self.gamma * transitions, rewards)
+        # Duplicate (state, successor) entries are summed when building the CSR matrix
+        transitions = csr_matrix((probs.ravel(), (np.repeat(states, probs.shape[1]), next_states.ravel())),
+                                 shape=(self.n_states, self.n_states))
+        return spsolve((identity(self.n_states, format="csr") - self.gamma * transitions).tocsc(), rewards)
+    def simulate_policy(self, n_episodes=100000, policy=None, max_steps=100, seed=None):
+        """
+        Monte Carlo estimate of a policy (the greedy one by default): runs
+        n_episodes at once as arrays, sampling next states from the compiled
+        model. Episodes are cut after max_steps, like gymnasium's 100-step
+        time limit for FrozenLake-v1. Returns the success rate, the mean
+        discounted return (comparable to evaluate_policy at the start state)
+        and a histogram of episode lengths indexed by length.
+        """
+        policy = self.policy if policy is None else policy
+        rng = np.random.default_rng(seed)
+        goal = np.asarray(self.map_layout, dtype="c").ravel() == b"G"
+        states = rng.choice(self.start_states, size=n_episodes)
+        running = np.ones(n_episodes, dtype=bool)
+        lengths = np.full(n_episodes, max_steps)
+        returns = np.zeros(n_episodes)
+        cumulative_probs = np.cumsum(self.probs, axis=2)
+        for step in range(max_steps):
+            episodes = np.flatnonzero(running)
+            if len(episodes) == 0:
+                break
+            current, actions = states[episodes], policy[states[episodes]]
+            # Inverse-CDF sampling of one successor slot per running episode
+            draws = rng.random(len(episodes))[:, None]
+            slots = np.minimum(np.sum(draws >= cumulative_probs[current, actions], axis=1), self.probs.shape[2] - 1)
+            next_states = self.next_states[current, actions, slots]
+            states[episodes] = next_states
+            returns[episodes] += self.gamma ** step * goal[next_states]
+            finished = episodes[self.terminal[next_states]]
+            running[finished] = False
+            lengths[finished] = step + 1
+        success = goal[states] & ~running
+        return {
+            "success_rate": success.mean(),
+            "mean_return": returns.mean(),
+            "episode_lengths": np.bincount(lengths, minlength=max_steps + 1),
+        }
+    def cache_prefix(self):
+        # Identifies the dynamics only, shared by every gamma and tolerance
+        model = {"map": self.map_layout, "is_slippery": self.is_slippery, "solver_version": SOLVER_VERSION}
+        return hashlib.sha256(json.dumps(model).encode()).hexdigest()[:16]
+    def cache_path(self, tolerance):
+        # float() first, so NumPy scalars hash like the equal Python floats
+        params = json.dumps({"gamma": repr(float(self.gamma)), "tolerance": repr(float(tolerance)), "dtype": self.dtype.name})
+        return os.path.join(self.cache_dir, f"{self.cache_prefix()}-{hashlib.sha256(params.encode()).hexdigest()[:16]}.npz")
+    def load_from_cache(self, tolerance):
+        """
+        Returns True if a table solved with the same map, slipperiness, gamma
+        and tolerance was loaded. Otherwise warm-starts from the cached table
+        for the same map with the closest gamma, if there is one.
+        """
+        path = self.cache_path(tolerance)
+        if os.path.exists(path):
+            with np.load(path) as cached:
+                self.value_table = cached["value_table"]
+                self._policy = cached["policy"]
+            return True
+        candidates = glob.glob(os.path.join(self.cache_dir, f"{self.cache_prefix()}-*.npz"))
+        if candidates:
+            closest = None
+            for candidate in candidates:
+                with np.load(candidate) as cached:
+                    distance = abs(float(cached["gamma"]) - self.gamma)
+                    if closest is None or distance < closest[0]:
+                        closest = (distance, cached["value_table"].astype(self.dtype))
+            self.value_table = closest[1]
+        return False
+    def save_to_cache(self, tolerance):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.cache_path(tolerance)
+        # Write to a temporary file first so concurrent jobs never read a partial entry
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as f:
+            np.savez(f, value_table=self.value_table, policy=self.policy,
+                     gamma=self.gamma, tolerance=tolerance)
+        os.replace(temporary_path, path)
+    def compute_value_iteration(self, tolerance=1e-8, stopping=(), policy_patience=5, time_budget=None, on_sweep=None):
+        """
+        on_sweep, if given, is called as on_sweep(iteration, delta, table_view)
+        after every sweep with a read-only view of the value table. Sweeps
+        alternate between two preallocated tables, so copy the view to keep
+        it past the next sweep.
+        """
+        self.ensure_precision(tolerance)
+        self.stopping = StoppingCriteria(tolerance, self.gamma, stopping, policy_patience, time_budget)
+        if self.cache_dir is not None and self.load_from_cache(tolerance):
+            self.stopping.fired = "cache"
+            self.stopping.finish(0)
+            return self.stopping
+        moving = ~self.terminal
+        updatable = int(np.count_nonzero(moving))
+        # Ping-pong tables plus scratch arrays, allocated once per solve
+        current = np.array(self.value_table, dtype=self.dtype)
+        new = current.copy()
+        diff = np.empty_like(current)
+        q_values = np.empty((self.n_states, self.n_actions), dtype=self.dtype)
+        gather = np.empty(self.next_states.shape, dtype=self.dtype) if self.sparse else None
+        while True:
+            # Bellman Equation: max over actions, terminal states stay fixed
+            if self.backend == "numba":
+                compiled(csr_sync_sweep)(current, new, self.row_start, self.columns, self.data,
+                               self.R, self.terminal, self.n_actions, self.gamma)
+                policy = self.greedy_policy_of(current) if self.stopping.needs_policy else None
+            else:
+                self.compute_q_values(current, out=q_values, gather=gather)
+                np.max(q_values, axis=1, out=new)
+                np.copyto(new, current, where=self.terminal)
+                policy = greedy_actions(q_values) if self.stopping.needs_policy else None
+            done = self.stopping.check(np.subtract(new, current, out=diff), policy, where=moving)
+            current, new = new, current
+            if on_sweep is not None:
+                table_view = current.view()
+                table_view.flags.writeable = False
+                on_sweep(self.stopping.sweeps, self.stopping.delta, table_view)
+            if done:
+                break
+        self.value_table = current
+        self.stopping.finish(self.stopping.sweeps * updatable)
+        # Early-stopped tables are not converged to the tolerance, so only cache max-norm results
+        if self.cache_dir is not None and self.stopping.fired == "max_norm":
+            self.save_to_cache(tolerance)
+        return self.stopping
+    def compute_policy_iteration(self, max_iterations=1000):
+        """
+        Howard's policy iteration: exact evaluation of the current policy by a
+        sparse linear solve, then greedy improvement, until the policy stops
+        changing. Starts from the greedy policy of the current value table.
+        Returns the same StoppingCriteria record as compute_value_iteration,
+        with one "sweep" per improvement step.
+        """
+        self.stopping = StoppingCriteria(0.0, self.gamma)
+        states = np.arange(self.n_states)
+        policy = self.policy
+        for _ in range(max_iterations):
+            value_table = self.evaluate_policy(policy)
+            q_values = self.compute_q_values(value_table)
+            # Keep the current action on ties so the policy cannot cycle
+            # between equally good actions
+            keep = q_values[states, policy] >= q_values.max(axis=1) - 1e-12
+            new_policy = np.where(keep, policy, greedy_actions(q_values))
+            self.stopping.sweeps += 1
+            self.stopping.delta = np.max(np.abs(value_table - self.value_table))
+            # Improvement works on the float64 solve; the table keeps the agent's dtype
+            self.value_table = value_table.astype(self.dtype, copy=False)
+            if np.array_equal(new_policy, policy):
+                self.stopping.fired = "policy"
+                break
+            policy = new_policy
+        self._policy = policy
+        self.stopping.finish(self.stopping.sweeps * self.n_states)
+        return self.stopping
+    def compute_modified_policy_iteration(self, evaluation_sweeps=5, tolerance=1e-8, stopping=(), policy_patience=5, time_budget=None):
+        """
+        Modified policy iteration: each iteration is one greedy Bellman backup
+        followed by evaluation_sweeps cheap backups under the fixed greedy
+        policy (no max over actions). evaluation_sweeps=0 is plain value
+        iteration. Stops on the same rules as compute_value_iteration, applied
+        to the change made by the greedy backup.
+        """
+        self.ensure_precision(tolerance)
+        self.stopping = StoppingCriteria(tolerance, self.gamma, stopping, policy_patience, time_budget)
+        states = np.arange(self.n_states)
+        updatable = int(np.count_nonzero(~self.terminal))
         while True:
-            updated_v = np.copy(self.value_table)
-            for s in range(self.n_states):
-                # Bellman Equation: max over actions
-                self.value_table[s] = max([
-                    sum(prob * (reward + self.gamma * updated_v[next_s])
-                        for prob, next_s, reward, _ in P[s][a])
-                    for a in range(self.n_actions)
-                ])
-            if np.max(np.abs(updated_v - self.value_table)) < 1e-8:
+            # compute_q_values only reads the table, so it needs no copy
+            current = self.value_table
+            q_values = self.compute_q_values(current)
+            policy = greedy_actions(q_values)
+            value_table = np.where(self.terminal, current, q_values.max(axis=1))
+            done = self.stopping.check(value_table - current, policy, where=~self.terminal)
+            if not done:
+                rewards = self.R[states, policy]
+                next_states, probs = self.next_states[states, policy], self.probs[states, policy]
+                for _ in range(evaluation_sweeps):
+                    evaluated = rewards + self.gamma * np.sum(probs * value_table[next_states], axis=1)
+                    value_table = np.where(self.terminal, value_table, evaluated)
+            self.value_table = value_table
+            if done:
                 break
-    def play(self):
+        self.stopping.finish(self.stopping.sweeps * (evaluation_sweeps + 1) * updatable)
+        return self.stopping
+    def patch_rows(self, first, last):
+        """
+        Recompiles the model of map rows first:last in place, building them
+        with one halo row on either side, which holds all their successors.
+        """
+        n_rows, n_cols = len(self.map_layout), len(self.map_layout[0])
+        top, bottom = max(first - 1, 0), min(last + 1, n_rows)
+        next_states, probs, rewards, terminal = build_transition_model(self.map_layout[top:bottom], self.is_slippery)
+        keep = slice((first - top) * n_cols, (last - top) * n_cols)
+        lo, hi = first * n_cols, last * n_cols
+        self.next_states[lo:hi] = next_states[keep] + top * n_cols
+        self.probs[lo:hi] = probs[keep]
+        self.R[lo:hi] = rewards[keep]
+        self.terminal[lo:hi] = terminal[keep]
+        if not self.sparse:
+            self.T[lo:hi] = 0.0
+            states = np.arange(lo, hi)[:, None, None] - lo
+            actions = np.arange(self.n_actions)[None, :, None]
+            np.add.at(self.T[lo:hi], (states, actions, self.next_states[lo:hi]), self.probs[lo:hi])
+    def predecessors(self, states):
+        """
+        Non-terminal states that can move into any of the given states.
+        Successors are at most one step away, so the states themselves and
+        their neighbours cover every predecessor (re-scoring the few that
+        are not is harmless).
+        """
+        n_rows, n_cols = len(self.map_layout), len(self.map_layout[0])
+        rows, cols = np.divmod(np.asarray(states), n_cols)
+        moves = np.vstack([(0, 0), ACTION_MOVES])
+        candidate_rows = rows[:, None] + moves[:, 0]
+        candidate_cols = cols[:, None] + moves[:, 1]
+        inside = (candidate_rows >= 0) & (candidate_rows < n_rows) & (candidate_cols >= 0) & (candidate_cols < n_cols)
+        candidates = np.unique(candidate_rows[inside] * n_cols + candidate_cols[inside])
+        return candidates[~self.terminal[candidates]]
+    def backup_values(self, states):
+        # Bellman backups of a set of states, without writing them
+        expected_next = np.sum(self.probs[states] * self.value_table[self.next_states[states]], axis=2)
+        return np.max(self.R[states] + self.gamma * expected_next, axis=1)
+    def update_tiles(self, tiles, tolerance=1e-8, max_sweeps=1000):
+        """
+        Edits map tiles, e.g. {(row, col): "H"}, patches the compiled model
+        around each edit in place and re-converges from the current value
+        table by prioritized sweeping, seeded with the edited states and
+        their predecessors only. Every state whose Bellman error is within a
+        factor of two of the largest queued one is backed up in one batch.
+        Returns a StoppingCriteria record whose sweeps are full-sweep
+        equivalents of the backups spent.
+        """
+        n_rows, n_cols = len(self.map_layout), len(self.map_layout[0])
+        # Every tile is checked before any is applied, so a bad one leaves the map untouched
+        for (row, col), letter in tiles.items():
+            if letter not in ("S", "F", "H", "G"):
+                raise ValueError(f"Unknown tile {letter!r}, expected one of 'S', 'F', 'H', 'G'")
+            if not (0 <= row < n_rows and 0 <= col < n_cols):
+                raise ValueError(f"Tile {(row, col)} is outside the {n_rows}x{n_cols} map")
+        for (row, col), letter in tiles.items():
+            self.map_layout[row] = self.map_layout[row][:col] + letter + self.map_layout[row][col + 1:]
+        for row in sorted({row for row, _ in tiles}):
+            self.patch_rows(max(row - 1, 0), min(row + 2, n_rows))
+        if self.backend == "numba":
+            self.row_start, self.columns, self.data = successors_to_csr(self.next_states, self.probs)
+        self.start_states = np.flatnonzero(np.asarray(self.map_layout, dtype="c").ravel() == b"S")
+        edited = np.array([row * n_cols + col for row, col in tiles], dtype=int)
+        values = self.value_table
+        # Holes and goals are never backed up and are worth 0
+        values[edited[self.terminal[edited]]] = 0.0
+        self._policy = None
+        self.stopping = StoppingCriteria(tolerance, self.gamma)
+        # Same queue discipline as PrioritizedSweepingValueIteration: negated
+        # priorities in a min-heap, stale entries skipped on pop
+        priority = {}
+        queue = []
+        def rescore(states):
+            errors = np.abs(self.backup_values(states) - values[states])
+            moving = errors >= tolerance
+            for state, error in zip(states[moving].tolist(), errors[moving].tolist()):
+                if error != priority.get(state):
+                    priority[state] = error
+                    heapq.heappush(queue, (-error, state))
+        rescore(self.predecessors(edited))
+        sweep_size = max(int(np.count_nonzero(~self.terminal)), 1)
+        backups = 0
+        while queue and backups < max_sweeps * sweep_size:
+            threshold = queue[0][0] / 2
+            batch = []
+            while queue and queue[0][0] <= threshold:
+                error, state = heapq.heappop(queue)
+                if priority.get(state) == -error:
+                    del priority[state]
+                    batch.append(state)
+            if not batch:
+                continue
+            batch = np.array(batch)
+            values[batch] = self.backup_values(batch)
+            backups += len(batch)
+            rescore(self.predecessors(batch))
+        self.stopping.sweeps = -(-backups // sweep_size)
+        self.stopping.delta = max(priority.values(), default=0.0)
+        if not priority:
+            self.stopping.fired = "max_norm"
+        self.stopping.finish(backups)
+        return self.stopping
+    def solve(self, method="value_iteration", **kwargs):
+        """
+        Runs one of "value_iteration", "policy_iteration" or
+        "modified_policy_iteration" with its keyword arguments and returns
+        its StoppingCriteria record.
+        """
+        solvers = {
+            "value_iteration": self.compute_value_iteration,
+            "policy_iteration": self.compute_policy_iteration,
+            "modified_policy_iteration": self.compute_modified_policy_iteration,
+        }
+        if method not in solvers:
+            raise ValueError(f"Unknown method {method!r}, expected one of {sorted(solvers)}")
+        return solvers[method](**kwargs)
+    def play(self, render_mode="human"):
+        """
+        Rolls out one greedy episode and returns its final reward. Pass
+        render_mode=None to play headless without the per-step delay.
+        """
+        self.env = self.make_env(render_mode)
         state, _ = self.env.reset()
         done = False
+        policy = self.policy
         while not done:
-            # Find best action based on learned values
-            P = self.env.unwrapped.P
-            action = np.argmax([
-                sum(prob * (reward + self.gamma * self.value_table[next_s])
-                    for prob, next_s, reward, _ in P[state][a])
-                for a in range(self.n_actions)
-            ])
+            # Best action based on learned values is a single lookup
+            action = int(policy[state])
             state, reward, terminated, truncated, _ = self.env.step(action)
             done = terminated or truncated
-            time.sleep(2)
+            if render_mode is not None:
+                time.sleep(2)
         self.env.close()
+        return reward
 if __name__ == "__main__":
-    agent = CustomFrozenLake(MY_MAP,is_slippery=False)
-    agent.compute_value_iteration()
+    agent = CustomFrozenLake(MY_MAP,is_slippery=False, cache_dir=".value_cache")
+    stopping = agent.compute_value_iteration()
     print("Value Table Learned for Custom Map!")
+    print(stopping.summary())
     agent.play()
\ No newline at end of file